@@ -0,0 +1,33 @@
+"""add gender on players and tourneys
+
+Revision ID: 5c1e2f8a9d04
+Revises: cb08834d0900
+Create Date: 2026-10-19 09:12:04.118253
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e2f8a9d04"
+down_revision: Union[str, None] = "cb08834d0900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("joueurs", sa.Column("gender", sa.String(), nullable=True))
+    op.add_column("tournois", sa.Column("gender", sa.String(), nullable=True))
+    op.create_index("ix_joueurs_gender", "joueurs", ["gender"])
+    op.create_index("ix_tournois_tourney_date", "tournois", ["tourney_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tournois_tourney_date", table_name="tournois")
+    op.drop_index("ix_joueurs_gender", table_name="joueurs")
+    op.drop_column("tournois", "gender")
+    op.drop_column("joueurs", "gender")
@@ -0,0 +1,38 @@
+"""add joueurs alias
+
+Revision ID: 8e4b7a31c6f2
+Revises: 5c1e2f8a9d04
+Create Date: 2026-10-19 10:02:41.530917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4b7a31c6f2"
+down_revision: Union[str, None] = "5c1e2f8a9d04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "joueurs_alias",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("alias", sa.String(), nullable=False),
+        sa.Column("ioc", sa.String(), nullable=False),
+        sa.Column("joueur_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["joueur_id"], ["joueurs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("alias", "ioc", name="_alias_ioc_uc"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("joueurs_alias")
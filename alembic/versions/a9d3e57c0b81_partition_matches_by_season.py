@@ -0,0 +1,213 @@
+"""partition matches by season
+
+The season column is backfilled by batches committed one by one, then the
+matches are copied into the partitioned table (one table per season on
+SQLite) in the migration transaction: the copy is a single-transaction
+rewrite of the table, matches stay locked until it commits.
+
+Revision ID: a9d3e57c0b81
+Revises: f4c6e1d09a23
+Create Date: 2026-10-19 17:32:05.904716
+
+"""
+
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3e57c0b81"
+down_revision: Union[str, None] = "f4c6e1d09a23"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# rows updated by each backfill statement
+BATCH_SIZE = 10_000
+
+SMALL_COLS = [
+    "round",
+    "surface",
+    "best_of",
+    "minutes",
+    "w_ace",
+    "w_df",
+    "w_svpt",
+    "w_1stIn",
+    "w_1stWon",
+    "w_2ndWon",
+    "w_SvGms",
+    "w_bpSaved",
+    "w_bpFaced",
+    "l_ace",
+    "l_df",
+    "l_svpt",
+    "l_1stIn",
+    "l_1stWon",
+    "l_2ndWon",
+    "l_SvGms",
+    "l_bpSaved",
+    "l_bpFaced",
+    "winner_rank",
+    "loser_rank",
+]
+
+
+def _match_columns(partitioned: bool) -> list:
+    """
+    Columns and constraints of a matches table, with the ``season`` partition
+    key in the primary key and the unique constraint when ``partitioned``.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        id_col = sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('matches_id_seq')"),
+            nullable=False,
+        )
+    else:
+        id_col = sa.Column("id", sa.Integer(), nullable=False)
+    items = [id_col]
+    if partitioned:
+        items.append(sa.Column("season", sa.SmallInteger(), nullable=False))
+    items += [
+        sa.Column("tourney_id", sa.Integer(), nullable=False),
+        sa.Column("winner_id", sa.Integer(), nullable=False),
+        sa.Column("loser_id", sa.Integer(), nullable=False),
+        sa.Column("winner_entry", sa.String()),
+        sa.Column("loser_entry", sa.String()),
+        sa.Column("score", sa.String()),
+    ]
+    items += [sa.Column(col, sa.SmallInteger()) for col in SMALL_COLS]
+    items += [
+        sa.Column("winner_rank_points", sa.Integer()),
+        sa.Column("loser_rank_points", sa.Integer()),
+        sa.Column("row_hash", sa.BigInteger()),
+    ]
+    keys = ["tourney_id", "winner_id", "loser_id"]
+    if partitioned:
+        items += [
+            sa.PrimaryKeyConstraint("id", "season"),
+            sa.UniqueConstraint("season", *keys, name="_match_uc"),
+        ]
+    else:
+        items += [
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(*keys, name="_match_uc"),
+        ]
+    items += [
+        sa.ForeignKeyConstraint(
+            ["tourney_id"], ["tournois.id"], name="matches_tourney_id_fkey"
+        ),
+        sa.ForeignKeyConstraint(
+            ["winner_id"], ["joueurs.id"], name="matches_winner_id_fkey"
+        ),
+        sa.ForeignKeyConstraint(
+            ["loser_id"], ["joueurs.id"], name="matches_loser_id_fkey"
+        ),
+    ]
+    return items
+
+
+def _column_names(partitioned: bool) -> str:
+    names = [
+        item.name for item in _match_columns(partitioned) if isinstance(item, sa.Column)
+    ]
+    return ", ".join(f'"{name}"' for name in names)
+
+
+def _seasons(table: str) -> List[int]:
+    rows = op.get_bind().execute(sa.text(f"SELECT DISTINCT season FROM {table}"))
+    return sorted(row[0] for row in rows)
+
+
+def _season_tables() -> List[str]:
+    names = sa.inspect(op.get_bind()).get_table_names()
+    return sorted(
+        (name for name in names if name.startswith("matches_") and name[8:].isdigit()),
+        key=lambda name: int(name[8:]),
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    postgres = conn.dialect.name == "postgresql"
+
+    # the backfill below is committed: on a rerun after a failure the column
+    # is already there, and the UPDATE can run again
+    columns = {col["name"] for col in sa.inspect(conn).get_columns("matches")}
+    if "season" not in columns:
+        op.add_column("matches", sa.Column("season", sa.SmallInteger(), nullable=True))
+    if postgres:
+        year = "CAST(EXTRACT(YEAR FROM t.tourney_date) AS INTEGER)"
+    else:
+        year = "CAST(strftime('%Y', t.tourney_date) AS INTEGER)"
+    # outside of the migration transaction, each batch is committed
+    with op.get_context().autocommit_block():
+        bounds = conn.execute(sa.text("SELECT MIN(id), MAX(id) FROM matches")).one()
+        if bounds[0] is not None:
+            for start in range(bounds[0], bounds[1] + 1, BATCH_SIZE):
+                conn.execute(
+                    sa.text(
+                        f"UPDATE matches SET season = COALESCE((SELECT {year} "
+                        "FROM tournois t WHERE t.id = matches.tourney_id), 0) "
+                        "WHERE id >= :start AND id < :stop"
+                    ),
+                    {"start": start, "stop": start + BATCH_SIZE},
+                )
+
+    columns = _column_names(partitioned=True)
+    if postgres:
+        # free the names used by the new table, keep the id sequence
+        op.execute("ALTER TABLE matches RENAME TO matches_legacy")
+        op.execute("ALTER TABLE matches_legacy DROP CONSTRAINT _match_uc")
+        op.execute("ALTER INDEX matches_pkey RENAME TO matches_legacy_pkey")
+        op.execute("ALTER SEQUENCE matches_id_seq OWNED BY NONE")
+        op.create_table(
+            "matches",
+            *_match_columns(partitioned=True),
+            postgresql_partition_by="RANGE (season)",
+        )
+        for season in _seasons("matches_legacy"):
+            op.execute(
+                f"CREATE TABLE matches_{season} PARTITION OF matches "
+                f"FOR VALUES FROM ({season}) TO ({season + 1})"
+            )
+        # Postgres routes each row to the partition of its season
+        op.execute(
+            f"INSERT INTO matches ({columns}) SELECT {columns} FROM matches_legacy"
+        )
+        op.drop_table("matches_legacy")
+        op.execute("ALTER SEQUENCE matches_id_seq OWNED BY matches.id")
+    else:
+        # SQLite has no partitioning: one matches_<season> table per season
+        for season in _seasons("matches"):
+            op.create_table(f"matches_{season}", *_match_columns(partitioned=True))
+            op.execute(
+                f"INSERT INTO matches_{season} ({columns}) SELECT {columns} "
+                f"FROM matches WHERE season = {season}"
+            )
+        op.drop_table("matches")
+
+
+def downgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    columns = _column_names(partitioned=False)
+
+    if postgres:
+        op.execute("ALTER SEQUENCE matches_id_seq OWNED BY NONE")
+        op.execute("ALTER TABLE matches RENAME TO matches_partitioned")
+        op.execute("ALTER TABLE matches_partitioned DROP CONSTRAINT _match_uc")
+        op.execute("ALTER INDEX matches_pkey RENAME TO matches_partitioned_pkey")
+        op.create_table("matches", *_match_columns(partitioned=False))
+        op.execute(
+            f"INSERT INTO matches ({columns}) SELECT {columns} FROM matches_partitioned"
+        )
+        op.drop_table("matches_partitioned")  # drops the partitions too
+        op.execute("ALTER SEQUENCE matches_id_seq OWNED BY matches.id")
+    else:
+        op.create_table("matches", *_match_columns(partitioned=False))
+        for table in _season_tables():
+            op.execute(f"INSERT INTO matches ({columns}) SELECT {columns} FROM {table}")
+            op.drop_table(table)
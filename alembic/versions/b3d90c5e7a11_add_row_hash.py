@@ -0,0 +1,33 @@
+"""add row hash fingerprints
+
+Revision ID: b3d90c5e7a11
+Revises: 8e4b7a31c6f2
+Create Date: 2026-10-19 11:20:13.684002
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d90c5e7a11"
+down_revision: Union[str, None] = "8e4b7a31c6f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # rows written before this revision keep a NULL hash and are rewritten
+    # once by the next run of the writers
+    op.add_column("joueurs", sa.Column("row_hash", sa.BigInteger(), nullable=True))
+    op.add_column("tournois", sa.Column("row_hash", sa.BigInteger(), nullable=True))
+    op.add_column("matches", sa.Column("row_hash", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("matches", "row_hash")
+    op.drop_column("tournois", "row_hash")
+    op.drop_column("joueurs", "row_hash")
@@ -0,0 +1,184 @@
+"""one tournament row per (tourney_id, gender)
+
+Revision ID: c5b1f7e2d840
+Revises: a9d3e57c0b81
+Create Date: 2026-10-19 18:05:41.227630
+
+"""
+
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5b1f7e2d840"
+down_revision: Union[str, None] = "a9d3e57c0b81"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name given to the unnamed unique constraint of tournois.tourney_id on SQLite
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+TOURNEY_COLS = [
+    "tourney_id",
+    "tourney_name",
+    "surface",
+    "draw_size",
+    "tourney_level",
+    "tourney_date",
+    "tourney_start_date",
+]
+
+
+# tourney_level values only used by one tour, the others (Grand Slams,
+# Olympics, team cups, finals) are shared
+TOUR_LEVELS = {"atp": ["A", "M"], "wta": ["P", "PM", "I", "W"]}
+
+
+def _match_tables() -> List[str]:
+    """
+    The partitioned matches table on Postgres, the season tables on SQLite.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        return ["matches"]
+    names = sa.inspect(op.get_bind()).get_table_names()
+    return [n for n in names if n.startswith("matches_") and n[8:].isdigit()]
+
+
+def _set_majority_gender(table: str, pairs: str) -> None:
+    """
+    Give the rows of ``table`` without gender the most frequent gender of
+    the ``(id, gender)`` rows of the ``pairs`` query.
+    """
+    conn = op.get_bind()
+    counts = conn.execute(
+        sa.text(
+            f"SELECT p.id, p.gender, COUNT(*) FROM ({pairs}) p GROUP BY p.id, p.gender"
+        )
+    )
+    best = {}
+    for row_id, gender, count in counts:
+        if (count, gender) > best.get(row_id, (0, "")):
+            best[row_id] = (count, gender)
+    if best:
+        conn.execute(
+            sa.text(f"UPDATE {table} SET gender = :gender WHERE id = :id"),
+            [{"id": row_id, "gender": gender} for row_id, (_, gender) in best.items()],
+        )
+
+
+def _backfill_genders(tables: List[str]) -> None:
+    """
+    Fill the genders left NULL by 5c1e2f8a9d04 on databases loaded before it:
+    tournaments from their tourney_level, players from the tour of their
+    tournaments then of their opponents, and the shared tournaments from
+    their winners.
+    """
+    for gender, levels in TOUR_LEVELS.items():
+        op.execute(
+            f"UPDATE tournois SET gender = '{gender}' WHERE gender IS NULL "
+            f"AND tourney_level IN ({', '.join(repr(lv) for lv in levels)})"
+        )
+    if not tables:
+        return
+
+    matches = " UNION ALL ".join(
+        f"SELECT tourney_id, winner_id, loser_id FROM {table}" for table in tables
+    )
+    sides = (
+        f"SELECT m.tourney_id, m.winner_id AS player, m.loser_id AS opponent "
+        f"FROM ({matches}) m UNION ALL "
+        f"SELECT m.tourney_id, m.loser_id, m.winner_id FROM ({matches}) m"
+    )
+    _set_majority_gender(
+        "joueurs",
+        f"SELECT s.player AS id, t.gender FROM ({sides}) s "
+        "JOIN tournois t ON t.id = s.tourney_id "
+        "JOIN joueurs j ON j.id = s.player "
+        "WHERE j.gender IS NULL AND t.gender IS NOT NULL",
+    )
+    _set_majority_gender(
+        "joueurs",
+        f"SELECT s.player AS id, o.gender FROM ({sides}) s "
+        "JOIN joueurs o ON o.id = s.opponent "
+        "JOIN joueurs j ON j.id = s.player "
+        "WHERE j.gender IS NULL AND o.gender IS NOT NULL",
+    )
+    _set_majority_gender(
+        "tournois",
+        f"SELECT m.tourney_id AS id, j.gender FROM ({matches}) m "
+        "JOIN tournois t ON t.id = m.tourney_id "
+        "JOIN joueurs j ON j.id = m.winner_id "
+        "WHERE t.gender IS NULL AND j.gender IS NOT NULL",
+    )
+
+
+def upgrade() -> None:
+    _backfill_genders(_match_tables())
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("tournois_tourney_id_key", "tournois", type_="unique")
+        op.create_unique_constraint(
+            "_tourney_gender_uc", "tournois", ["tourney_id", "gender"]
+        )
+    else:
+        with op.batch_alter_table(
+            "tournois", naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint("uq_tournois_tourney_id", type_="unique")
+            batch_op.create_unique_constraint(
+                "_tourney_gender_uc", ["tourney_id", "gender"]
+            )
+
+    # Grand Slams were stored once, with the gender of the first tour loaded:
+    # give the matches won by players of the other tour their own tournament
+    for table in _match_tables():
+        op.execute(
+            f"INSERT INTO tournois ({', '.join(TOURNEY_COLS)}, gender) "
+            f"SELECT DISTINCT {', '.join('t.' + c for c in TOURNEY_COLS)}, j.gender "
+            f"FROM {table} m JOIN tournois t ON t.id = m.tourney_id "
+            "JOIN joueurs j ON j.id = m.winner_id "
+            "WHERE j.gender IS NOT NULL AND j.gender <> t.gender "
+            "AND NOT EXISTS (SELECT 1 FROM tournois t2 "
+            "WHERE t2.tourney_id = t.tourney_id AND t2.gender = j.gender)"
+        )
+        op.execute(
+            f"UPDATE {table} SET tourney_id = ("
+            "SELECT t2.id FROM tournois t "
+            "JOIN tournois t2 ON t2.tourney_id = t.tourney_id "
+            "JOIN joueurs j ON j.gender = t2.gender "
+            f"WHERE t.id = {table}.tourney_id AND j.id = {table}.winner_id) "
+            "WHERE EXISTS (SELECT 1 FROM tournois t JOIN joueurs j "
+            f"ON j.id = {table}.winner_id WHERE t.id = {table}.tourney_id "
+            "AND j.gender IS NOT NULL AND j.gender <> t.gender)"
+        )
+
+
+def downgrade() -> None:
+    # merge the tournaments of a tourney_id back in the oldest row
+    first_id = (
+        "(SELECT MIN(t2.id) FROM tournois t2 WHERE t2.tourney_id = {ref}.tourney_id)"
+    )
+    for table in _match_tables():
+        op.execute(
+            f"UPDATE {table} SET tourney_id = (SELECT MIN(t2.id) FROM tournois t "
+            "JOIN tournois t2 ON t2.tourney_id = t.tourney_id "
+            f"WHERE t.id = {table}.tourney_id) "
+            "WHERE tourney_id IN (SELECT t.id FROM tournois t "
+            f"WHERE t.id > {first_id.format(ref='t')})"
+        )
+    op.execute(f"DELETE FROM tournois WHERE id > {first_id.format(ref='tournois')}")
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("_tourney_gender_uc", "tournois", type_="unique")
+        op.create_unique_constraint(
+            "tournois_tourney_id_key", "tournois", ["tourney_id"]
+        )
+    else:
+        with op.batch_alter_table(
+            "tournois", naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint("_tourney_gender_uc", type_="unique")
+            batch_op.create_unique_constraint("uq_tournois_tourney_id", ["tourney_id"])
@@ -0,0 +1,47 @@
+"""add live scores
+
+Revision ID: d71f3a6b2c58
+Revises: b3d90c5e7a11
+Create Date: 2026-10-19 14:05:52.207416
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d71f3a6b2c58"
+down_revision: Union[str, None] = "b3d90c5e7a11"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "live_scores",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("event_id", sa.String(), nullable=False),
+        sa.Column("tourney_name", sa.String(), nullable=True),
+        sa.Column("round", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("home_name", sa.String(), nullable=True),
+        sa.Column("away_name", sa.String(), nullable=True),
+        sa.Column("home_id", sa.Integer(), nullable=True),
+        sa.Column("away_id", sa.Integer(), nullable=True),
+        sa.Column("score", sa.String(), nullable=True),
+        sa.Column("home_odds", sa.Float(), nullable=True),
+        sa.Column("away_odds", sa.Float(), nullable=True),
+        sa.Column("row_hash", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["away_id"], ["joueurs.id"]),
+        sa.ForeignKeyConstraint(["home_id"], ["joueurs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("live_scores")
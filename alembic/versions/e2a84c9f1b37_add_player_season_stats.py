@@ -0,0 +1,51 @@
+"""add player season stats
+
+Revision ID: e2a84c9f1b37
+Revises: d71f3a6b2c58
+Create Date: 2026-10-19 15:31:08.902716
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a84c9f1b37"
+down_revision: Union[str, None] = "d71f3a6b2c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = [
+    "matches",
+    "wins",
+    "losses",
+    "sets_won",
+    "sets_lost",
+    "games_won",
+    "games_lost",
+    "tiebreaks_won",
+    "tiebreaks_lost",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "player_season_stats",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("joueur_id", sa.Integer(), nullable=False),
+        sa.Column("season", sa.SmallInteger(), nullable=False),
+        sa.Column("surface", sa.SmallInteger(), nullable=False),
+        *[sa.Column(col, sa.Integer(), nullable=False) for col in COUNTERS],
+        sa.ForeignKeyConstraint(["joueur_id"], ["joueurs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("joueur_id", "season", "surface", name="_player_season_uc"),
+    )
+    # the table is filled by DbNeon.refresh_player_season_stats() once, then
+    # incrementally by run_match_historic
+
+
+def downgrade() -> None:
+    op.drop_table("player_season_stats")
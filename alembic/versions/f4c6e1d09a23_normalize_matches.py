@@ -0,0 +1,198 @@
+"""normalize matches: integer fks, coded round/surface, typed stats
+
+Revision ID: f4c6e1d09a23
+Revises: e2a84c9f1b37
+Create Date: 2026-10-19 16:48:27.311582
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c6e1d09a23"
+down_revision: Union[str, None] = "e2a84c9f1b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# rows updated by each backfill statement
+BATCH_SIZE = 10_000
+
+SURFACE_CODES = {"Hard": 1, "Clay": 2, "Grass": 3, "Carpet": 4}
+
+SMALL_STAT_COLS = [
+    "best_of",
+    "minutes",
+    "w_ace",
+    "w_df",
+    "w_svpt",
+    "w_1stIn",
+    "w_1stWon",
+    "w_2ndWon",
+    "w_SvGms",
+    "w_bpSaved",
+    "w_bpFaced",
+    "l_ace",
+    "l_df",
+    "l_svpt",
+    "l_1stIn",
+    "l_1stWon",
+    "l_2ndWon",
+    "l_SvGms",
+    "l_bpSaved",
+    "l_bpFaced",
+    "winner_rank",
+    "loser_rank",
+]
+
+SERVE_COUNTERS = [
+    "aces",
+    "double_faults",
+    "serve_points",
+    "first_serves_in",
+    "first_serves_won",
+    "second_serves_won",
+    "service_games",
+    "break_points_saved",
+    "break_points_faced",
+]
+
+
+def _columns(table: str) -> set:
+    return {col["name"] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _add_column(table: str, column: sa.Column) -> None:
+    """
+    Add a column unless a previous failed run of the migration committed it.
+    """
+    if column.name not in _columns(table):
+        op.add_column(table, column)
+
+
+def _backfill(statement: str) -> None:
+    """
+    Run an UPDATE of the matches table by ranges of ids, so each statement
+    only locks and rewrites ``BATCH_SIZE`` rows.
+
+    The batches run outside of the migration transaction: the columns added
+    before are committed first, and each batch is committed on its own. As
+    alembic_version is only updated at the end, a migration failing after
+    the backfill is run again from the start: the columns are then added
+    with :func:`_add_column`, and the UPDATE only reads columns it does not
+    write.
+    """
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        bounds = conn.execute(sa.text("SELECT MIN(id), MAX(id) FROM matches")).one()
+        if bounds[0] is None:
+            return
+        for start in range(bounds[0], bounds[1] + 1, BATCH_SIZE):
+            conn.execute(
+                sa.text(f"{statement} WHERE id >= :start AND id < :stop"),
+                {"start": start, "stop": start + BATCH_SIZE},
+            )
+
+
+def upgrade() -> None:
+    _add_column("matches", sa.Column("tourney_ref", sa.Integer(), nullable=True))
+    _add_column("matches", sa.Column("round", sa.SmallInteger(), nullable=True))
+    _add_column("matches", sa.Column("surface", sa.SmallInteger(), nullable=True))
+    for col in SMALL_STAT_COLS:
+        _add_column("matches", sa.Column(col, sa.SmallInteger(), nullable=True))
+    _add_column("matches", sa.Column("winner_rank_points", sa.Integer()))
+    _add_column("matches", sa.Column("loser_rank_points", sa.Integer()))
+
+    # link to tournois.id and copy the surface of the tournament
+    surface_case = " ".join(
+        f"WHEN '{name}' THEN {code}" for name, code in SURFACE_CODES.items()
+    )
+    _backfill(
+        "UPDATE matches SET "
+        "tourney_ref = (SELECT t.id FROM tournois t "
+        "WHERE t.tourney_id = matches.tourney_id), "
+        f"surface = COALESCE((SELECT CASE t.surface {surface_case} ELSE 0 END "
+        "FROM tournois t WHERE t.tourney_id = matches.tourney_id), 0), "
+        "round = 0, "
+        # stats were never stored: the next run_match_historic sees a new
+        # fingerprint for every row and fills them
+        "row_hash = NULL"
+    )
+    # a match without tournament can not reference it
+    op.execute("DELETE FROM matches WHERE tourney_ref IS NULL")
+
+    with op.batch_alter_table("matches") as batch_op:
+        batch_op.drop_constraint("_match_uc", type_="unique")
+        batch_op.drop_column("tourney_id")
+        batch_op.drop_column("winner_name")
+        batch_op.drop_column("loser_name")
+        batch_op.alter_column(
+            "tourney_ref",
+            new_column_name="tourney_id",
+            existing_type=sa.Integer(),
+            nullable=False,
+        )
+    with op.batch_alter_table("matches") as batch_op:
+        batch_op.create_unique_constraint(
+            "_match_uc", ["tourney_id", "winner_id", "loser_id"]
+        )
+        batch_op.create_foreign_key(
+            "matches_tourney_id_fkey", "tournois", ["tourney_id"], ["id"]
+        )
+        batch_op.create_foreign_key(
+            "matches_winner_id_fkey", "joueurs", ["winner_id"], ["id"]
+        )
+        batch_op.create_foreign_key(
+            "matches_loser_id_fkey", "joueurs", ["loser_id"], ["id"]
+        )
+
+    for col in SERVE_COUNTERS:
+        op.add_column(
+            "player_season_stats",
+            sa.Column(col, sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    for col in reversed(SERVE_COUNTERS):
+        if col in _columns("player_season_stats"):
+            op.drop_column("player_season_stats", col)
+
+    _add_column("matches", sa.Column("tourney_code", sa.String(), nullable=True))
+    _add_column("matches", sa.Column("winner_name", sa.String(), nullable=True))
+    _add_column("matches", sa.Column("loser_name", sa.String(), nullable=True))
+    _backfill(
+        "UPDATE matches SET "
+        "tourney_code = (SELECT t.tourney_id FROM tournois t "
+        "WHERE t.id = matches.tourney_id), "
+        "winner_name = (SELECT j.name FROM joueurs j "
+        "WHERE j.id = matches.winner_id), "
+        "loser_name = (SELECT j.name FROM joueurs j WHERE j.id = matches.loser_id), "
+        "row_hash = NULL"
+    )
+
+    with op.batch_alter_table("matches") as batch_op:
+        batch_op.drop_constraint("matches_loser_id_fkey", type_="foreignkey")
+        batch_op.drop_constraint("matches_winner_id_fkey", type_="foreignkey")
+        batch_op.drop_constraint("matches_tourney_id_fkey", type_="foreignkey")
+        batch_op.drop_constraint("_match_uc", type_="unique")
+        batch_op.drop_column("tourney_id")
+        for col in ["loser_rank_points", "winner_rank_points"]:
+            batch_op.drop_column(col)
+        for col in reversed(SMALL_STAT_COLS):
+            batch_op.drop_column(col)
+        batch_op.drop_column("surface")
+        batch_op.drop_column("round")
+        batch_op.alter_column(
+            "tourney_code",
+            new_column_name="tourney_id",
+            existing_type=sa.String(),
+            nullable=False,
+        )
+    with op.batch_alter_table("matches") as batch_op:
+        batch_op.create_unique_constraint(
+            "_match_uc", ["tourney_id", "winner_id", "loser_id"]
+        )
@@ -1,13 +1,25 @@
+import argparse
+
 from tennis_win_fun.build_historic.historic_launcher import BuildHistoric
+from tennis_win_fun.build_historic.profiling import (
+    add_profile_arguments,
+    profiler_from_args,
+)
 
 bh = BuildHistoric()
 
 
-def main():
+def main(argv=None):
     """
     Main function to build historic data.
     """
+    parser = argparse.ArgumentParser(description="Build historic players and tourneys.")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    bh.profiler = profiler_from_args(args)
     bh.run()
+    bh.profiler.report()
 
 
 if __name__ == "__main__":
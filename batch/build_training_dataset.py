@@ -0,0 +1,17 @@
+import os
+
+from tennis_win_fun.analysis.dataset import build_training_dataset
+from tennis_win_fun.build_historic.models import DbNeon
+
+db = DbNeon(db_url=os.getenv("DATABASE_URL", "sqlite:///tennis.db"))
+
+
+def main():
+    """
+    Main function to build the point-in-time training dataset in Parquet.
+    """
+    build_training_dataset(db, os.getenv("DATASET_PATH", "training_dataset.parquet"))
+
+
+if __name__ == "__main__":
+    main()
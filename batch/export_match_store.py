@@ -0,0 +1,17 @@
+import os
+
+from tennis_win_fun.analysis.match_store import export_match_store
+from tennis_win_fun.build_historic.models import DbNeon
+
+db = DbNeon(db_url=os.getenv("DATABASE_URL", "sqlite:///tennis.db"))
+
+
+def main():
+    """
+    Main function to export the match history to a memory-mapped store.
+    """
+    export_match_store(db, os.getenv("MATCH_STORE_PATH", "match_store"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+import json
+import os
+
+from tennis_win_fun.build_historic.models import DbNeon
+from tennis_win_fun.build_historic.player_resolver import PlayerResolver
+from tennis_win_fun.live.watcher import (
+    EndpointSchedule,
+    LiveWatcher,
+    RapidApiSource,
+    StubSource,
+)
+
+db = DbNeon(db_url=os.getenv("DATABASE_URL", "sqlite:///tennis.db"))
+
+
+def main():
+    """
+    Main function to watch live scores and odds.
+
+    The endpoint paths of the API are read from LIVE_SCORES_PATH and
+    LIVE_ODDS_PATH (template with {event_id}). Without RAPIDAPI_KEY the
+    payloads are read from the JSON file LIVE_STUB_FILE ({path: payload}).
+    """
+    scores_path = os.environ["LIVE_SCORES_PATH"]
+    schedules = [EndpointSchedule("scores", scores_path, interval=5)]
+    if os.getenv("LIVE_ODDS_PATH"):
+        schedules.append(
+            EndpointSchedule(
+                "odds", os.environ["LIVE_ODDS_PATH"], interval=15, per_event=True
+            )
+        )
+
+    if os.getenv("RAPIDAPI_KEY"):
+        source = RapidApiSource(os.environ["RAPIDAPI_KEY"])
+    else:
+        with open(os.environ["LIVE_STUB_FILE"], encoding="utf-8") as f:
+            source = StubSource(json.load(f))
+
+    watcher = LiveWatcher(db, source, schedules, resolver=PlayerResolver.from_db(db))
+    asyncio.run(watcher.run())
+
+
+if __name__ == "__main__":
+    main()
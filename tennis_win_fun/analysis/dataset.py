@@ -0,0 +1,385 @@
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from tennis_win_fun.analysis.ratings import elo_history
+
+# Columns read from the database to build the dataset.
+MATCH_COLUMNS = [
+    "id",
+    "season",
+    "tourney_date",
+    "gender",
+    "tourney_id",
+    "surface",
+    "round",
+    "best_of",
+    "winner_id",
+    "loser_id",
+    "winner_rank",
+    "winner_rank_points",
+    "loser_rank",
+    "loser_rank_points",
+]
+
+# Features of each player, prefixed with player_1_ / player_2_ in the dataset.
+PLAYER_FEATURES = [
+    "elo",  # overall Elo rating
+    "elo_surface",  # Elo rating on the surface of the match
+    "played",  # matches played
+    "form",  # win rate over the last form_window matches
+    "days_off",  # days since the previous tournament played
+    "rank",
+    "rank_points",
+]
+
+DATASET_COLUMNS = (
+    [
+        "match_id",
+        "tourney_date",
+        "season",
+        "gender",
+        "tourney_id",
+        "surface",
+        "round",
+        "best_of",
+        "player_1_id",
+        "player_2_id",
+        "player_1_won",  # label
+    ]
+    + [f"{side}_{col}" for side in ["player_1", "player_2"] for col in PLAYER_FEATURES]
+    + ["h2h_matches", "player_1_h2h_wins"]
+)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow est requis pour écrire le dataset en Parquet "
+            "(pip install pyarrow)."
+        ) from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _long_format(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per player and match, in match order.
+    """
+    n = len(matches)
+    order = np.arange(n)
+    return pd.DataFrame(
+        {
+            "order": np.concatenate([order, order]),
+            "joueur_id": np.concatenate(
+                [matches["winner_id"].to_numpy(), matches["loser_id"].to_numpy()]
+            ),
+            "tourney_date": np.concatenate([matches["tourney_date"].to_numpy()] * 2),
+            "surface": np.concatenate([matches["surface"].to_numpy()] * 2),
+            "won": np.repeat(np.array([1, 0], dtype="int8"), n),
+        }
+    )
+
+
+def _last_per_date(long: pd.DataFrame, by: list) -> pd.DataFrame:
+    """
+    Keep the state of ``by`` after its last match of each tourney_date,
+    sorted on tourney_date for ``merge_asof``.
+    """
+    long = long.sort_values(by + ["order"], kind="stable")
+    last = long.groupby(by + ["tourney_date"], sort=False).tail(1)
+    return last.drop(columns=["order"]).sort_values("tourney_date", kind="stable")
+
+
+def player_states(
+    matches: pd.DataFrame,
+    k: float = 32.0,
+    initial: float = 1500.0,
+    form_window: int = 10,
+) -> pd.DataFrame:
+    """
+    State of every player after each tournament date: Elo rating, number of
+    matches played and recent form.
+
+    Parameters
+    ----------
+    matches : pd.DataFrame
+        Matches ordered by date, with ``winner_id``, ``loser_id``,
+        ``tourney_date`` and ``surface`` columns.
+    k, initial : float
+        Elo parameters, see :func:`elo_history`.
+    form_window : int
+        Number of matches of the form.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (joueur_id, tourney_date), sorted on ``tourney_date``.
+    """
+    winner_elo, loser_elo = elo_history(
+        matches["winner_id"], matches["loser_id"], k, initial
+    )
+    long = _long_format(matches)
+    long["elo"] = np.concatenate([winner_elo, loser_elo]).astype("float32")
+    long = long.sort_values(["joueur_id", "order"], kind="stable")
+
+    players = long.groupby("joueur_id", sort=False)
+    long["played"] = (players.cumcount() + 1).astype("int32")
+    long["form"] = (
+        players["won"]
+        .rolling(form_window, min_periods=1)
+        .mean()
+        .reset_index(level=0, drop=True)
+        .astype("float32")
+    )
+    long["last_played"] = long["tourney_date"]
+    return _last_per_date(long.drop(columns=["surface", "won"]), ["joueur_id"])
+
+
+def surface_states(
+    matches: pd.DataFrame, k: float = 32.0, initial: float = 1500.0
+) -> pd.DataFrame:
+    """
+    Elo rating of every player on each surface after each tournament date,
+    the matches of every surface being replayed on their own.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (joueur_id, surface, tourney_date), sorted on
+        ``tourney_date``.
+    """
+    long = _long_format(matches)
+    elo = np.empty(len(long), dtype="float32")
+    n = len(matches)
+    for _, rows in matches.reset_index(drop=True).groupby("surface", sort=False):
+        winner_elo, loser_elo = elo_history(
+            rows["winner_id"], rows["loser_id"], k, initial
+        )
+        elo[rows.index] = winner_elo
+        elo[rows.index + n] = loser_elo
+    long["elo_surface"] = elo
+    return _last_per_date(long.drop(columns=["won"]), ["joueur_id", "surface"])
+
+
+def head_to_head_states(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Head-to-head record of every pair of players after each tournament date.
+
+    The pair is stored as (``low_id``, ``high_id``) with ``low_id`` the
+    smallest id, ``low_wins`` counts the wins of ``low_id``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (low_id, high_id, tourney_date), sorted on
+        ``tourney_date``.
+    """
+    winners = matches["winner_id"].to_numpy()
+    losers = matches["loser_id"].to_numpy()
+    pairs = pd.DataFrame(
+        {
+            "order": np.arange(len(matches)),
+            "low_id": np.minimum(winners, losers),
+            "high_id": np.maximum(winners, losers),
+            "tourney_date": matches["tourney_date"].to_numpy(),
+            "low_won": (winners < losers).astype("int32"),
+        }
+    )
+    pairs = pairs.sort_values(["low_id", "high_id", "order"], kind="stable")
+    grouped = pairs.groupby(["low_id", "high_id"], sort=False)
+    pairs["low_wins"] = grouped["low_won"].cumsum().astype("int32")
+    pairs["meetings"] = (grouped.cumcount() + 1).astype("int32")
+    return _last_per_date(pairs.drop(columns=["low_won"]), ["low_id", "high_id"])
+
+
+def _as_of(left: pd.DataFrame, right: pd.DataFrame, by: list) -> pd.DataFrame:
+    """
+    For each row of ``left``, the last state of ``right`` strictly before
+    its tourney_date, ``left`` being sorted on tourney_date.
+    """
+    return pd.merge_asof(
+        left, right, on="tourney_date", by=by, allow_exact_matches=False
+    )
+
+
+def build_features(
+    matches: pd.DataFrame,
+    players: pd.DataFrame,
+    surfaces: pd.DataFrame,
+    head_to_head: pd.DataFrame,
+    initial: float = 1500.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Build the training rows of ``matches`` from the states computed on the
+    whole history.
+
+    Features only use the matches of strictly earlier tournament dates:
+    the order of the matches inside a tournament is not known, so none of
+    them is visible from another match of the same tournament. Ranks are the
+    ones of the match, published before the tournament.
+
+    Players are assigned to ``player_1`` / ``player_2`` by a hash of the
+    match id and ``seed``, ``player_1_won`` is the label.
+
+    Parameters
+    ----------
+    matches : pd.DataFrame
+        Matches with the ``MATCH_COLUMNS``, ordered by date.
+    players, surfaces, head_to_head : pd.DataFrame
+        Outputs of :func:`player_states`, :func:`surface_states` and
+        :func:`head_to_head_states`.
+    initial : float
+        Elo rating of a player without previous match.
+    seed : int
+        Seed of the player_1 / player_2 assignment.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per match, in the order of ``matches``.
+    """
+    ids = matches["id"].to_numpy("int64")
+    flip = (pd.util.hash_array(ids + (seed << 32)) & 1).astype(bool)
+    df = pd.DataFrame(
+        {
+            "match_id": ids.astype("int32"),
+            "tourney_date": matches["tourney_date"].to_numpy(),
+            "season": matches["season"].to_numpy(),
+            # explicit string type, a chunk may hold no gender at all
+            "gender": pd.array(matches["gender"], dtype="string"),
+            "tourney_id": matches["tourney_id"].to_numpy(),
+            "surface": matches["surface"].to_numpy(),
+            "round": matches["round"].to_numpy(),
+            "best_of": matches["best_of"].to_numpy(),
+        }
+    )
+    for side, first, second in [
+        ("player_1", "loser", "winner"),
+        ("player_2", "winner", "loser"),
+    ]:
+        for col in ["id", "rank", "rank_points"]:
+            values = np.where(
+                flip, matches[f"{first}_{col}"], matches[f"{second}_{col}"]
+            )
+            df[f"{side}_{col}"] = pd.array(values, dtype=matches[f"winner_{col}"].dtype)
+    df["player_1_won"] = (~flip).astype("int8")
+
+    df["_row"] = np.arange(len(df))
+    df = df.sort_values("tourney_date", kind="stable")
+    for side in ["player_1", "player_2"]:
+        names = {
+            col: f"{side}_{col}" for col in ["elo", "played", "form", "last_played"]
+        }
+        state = players.rename(columns={"joueur_id": f"{side}_id", **names})
+        df = _as_of(df, state, [f"{side}_id"])
+        state = surfaces.rename(
+            columns={"joueur_id": f"{side}_id", "elo_surface": f"{side}_elo_surface"}
+        )
+        df = _as_of(df, state, [f"{side}_id", "surface"])
+
+        df[f"{side}_elo"] = df[f"{side}_elo"].fillna(initial)
+        df[f"{side}_elo_surface"] = df[f"{side}_elo_surface"].fillna(initial)
+        df[f"{side}_played"] = df[f"{side}_played"].fillna(0).astype("int32")
+        days_off = df["tourney_date"] - df.pop(f"{side}_last_played")
+        df[f"{side}_days_off"] = days_off.dt.days.astype("float32")
+
+    df["low_id"] = np.minimum(df["player_1_id"], df["player_2_id"])
+    df["high_id"] = np.maximum(df["player_1_id"], df["player_2_id"])
+    df = _as_of(df, head_to_head, ["low_id", "high_id"])
+    low_wins = df["low_wins"].fillna(0)
+    meetings = df["meetings"].fillna(0)
+    player_1_low = df["player_1_id"] == df["low_id"]
+    df["h2h_matches"] = meetings.astype("int32")
+    df["player_1_h2h_wins"] = np.where(
+        player_1_low, low_wins, meetings - low_wins
+    ).astype("int32")
+
+    df = df.sort_values("_row").reset_index(drop=True)
+    return df[DATASET_COLUMNS]
+
+
+def build_training_dataset(
+    db,
+    path: str,
+    genders: Optional[Iterable[str]] = None,
+    k: float = 32.0,
+    initial: float = 1500.0,
+    form_window: int = 10,
+    chunksize: int = 100_000,
+    seed: int = 0,
+) -> int:
+    """
+    Build the point-in-time training dataset of the match history and write
+    it to a Parquet file.
+
+    The states of the players (ratings, form, head-to-head) are computed
+    once over the whole history with cumulative group operations, then the
+    matches are joined to them ``chunksize`` rows at a time with sorted as-of
+    joins, and every chunk is written as a row group.
+
+    Only the features are built by chunks: the whole match history and the
+    state frames (about two rows per match for the players and the surfaces,
+    one per pair of players and date for the head-to-head) stay in memory
+    during the build, on top of one chunk of features.
+
+    Parameters
+    ----------
+    db : DbNeon
+        Database to read the matches from.
+    path : str
+        Parquet file to write.
+    genders : iterable of str, optional
+        Keep only these genders ("atp", "wta").
+    k, initial : float
+        Elo parameters.
+    form_window : int
+        Number of matches of the form.
+    chunksize : int
+        Number of matches built and written at once.
+    seed : int
+        Seed of the player_1 / player_2 assignment.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    pa, pq = _require_pyarrow()
+
+    matches = db.read_matches(columns=MATCH_COLUMNS, genders=genders)
+    matches = matches.dropna(subset=["tourney_date"]).reset_index(drop=True)
+    matches["surface"] = matches["surface"].fillna(0).astype("int8")
+    players = player_states(matches, k, initial, form_window)
+    surfaces = surface_states(matches, k, initial)
+    head_to_head = head_to_head_states(matches)
+
+    tmp = f"{path}.tmp"
+    writer = None
+    try:
+        for start in range(0, max(len(matches), 1), chunksize):
+            chunk = build_features(
+                matches.iloc[start : start + chunksize],
+                players,
+                surfaces,
+                head_to_head,
+                initial,
+                seed,
+            )
+            schema = writer.schema if writer is not None else None
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, path)
+
+    print(f"Dataset de {len(matches)} matchs écrit dans {path}.")
+    return len(matches)
@@ -0,0 +1,307 @@
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tennis_win_fun.build_historic.models import SURFACE_CODES
+
+# Value stored for a missing number, date or dictionary entry.
+MISSING = -1
+
+# Ordinal (``date.toordinal()``) of 1970-01-01.
+EPOCH_ORDINAL = 719163
+
+# Columns of the store and their fixed-width dtype.
+STORE_COLUMNS = {
+    "match_id": "int32",
+    "tourney_date": "int32",  # date ordinal
+    "surface": "int8",  # SURFACE_CODES, 0 is unknown
+    "gender": "int8",  # dictionary code
+    "tourney_id": "int32",  # tournois.id
+    "winner_id": "int32",
+    "loser_id": "int32",
+    "score": "int32",  # dictionary code
+}
+
+# Match statistics exported with the matches.
+STAT_COLUMNS = {
+    "best_of": "int8",
+    "round": "int8",  # ROUND_CODES, 0 is unknown
+    "minutes": "int16",
+    "w_ace": "int16",
+    "w_df": "int16",
+    "w_svpt": "int16",
+    "w_1stIn": "int16",
+    "w_1stWon": "int16",
+    "w_2ndWon": "int16",
+    "w_SvGms": "int16",
+    "w_bpSaved": "int16",
+    "w_bpFaced": "int16",
+    "l_ace": "int16",
+    "l_df": "int16",
+    "l_svpt": "int16",
+    "l_1stIn": "int16",
+    "l_1stWon": "int16",
+    "l_2ndWon": "int16",
+    "l_SvGms": "int16",
+    "l_bpSaved": "int16",
+    "l_bpFaced": "int16",
+    "winner_rank": "int16",
+    "winner_rank_points": "int32",
+    "loser_rank": "int16",
+    "loser_rank_points": "int32",
+}
+
+DICT_COLUMNS = ["gender", "score"]
+
+# Dictionaries growing with the history, stored next to the columns as
+# memory-mapped ``<col>.offsets.npy`` / ``<col>.bytes.npy`` files instead of
+# the sidecar.
+MAPPED_DICT_COLUMNS = ["score"]
+
+SIDECAR = "store.json"
+
+
+def to_ordinal(dates: pd.Series) -> np.ndarray:
+    """
+    Convert dates to int32 ordinals, ``MISSING`` for NaT.
+    """
+    days = pd.to_datetime(dates, errors="coerce").to_numpy("datetime64[D]")
+    ordinals = days.astype("int64") + EPOCH_ORDINAL
+    return np.where(np.isnat(days), MISSING, ordinals).astype("int32")
+
+
+def from_ordinal(ordinals: np.ndarray) -> np.ndarray:
+    """
+    Convert int32 ordinals back to ``datetime64[D]``, NaT for ``MISSING``.
+    """
+    ordinals = np.asarray(ordinals, dtype="int64")
+    days = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+    return np.where(ordinals == MISSING, np.datetime64("NaT"), days)
+
+
+def _encode(values: pd.Series, mapping: Dict[str, int], dtype: str) -> np.ndarray:
+    """
+    Dictionary encode ``values``, new values are appended to ``mapping``.
+    """
+    for value in pd.unique(values.dropna()):
+        if value not in mapping:
+            mapping[value] = len(mapping)
+    return values.map(mapping).fillna(MISSING).to_numpy(dtype)
+
+
+def _save_strings(directory: str, col: str, values: List[str]):
+    """
+    Write strings as UTF-8 bytes and the int64 offsets of each string.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="int64")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype="uint8")
+    np.save(os.path.join(directory, f"{col}.offsets.npy"), offsets)
+    np.save(os.path.join(directory, f"{col}.bytes.npy"), data)
+
+
+def _read_sidecar(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, SIDECAR), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def export_match_store(
+    db,
+    path: str,
+    genders: Optional[Iterable[str]] = None,
+    chunksize: int = 100_000,
+) -> "MatchStore":
+    """
+    Export the match history of the database to a memory-mappable store.
+
+    Every column is written as a fixed-width ``.npy`` file and strings are
+    dictionary encoded. The small dictionaries are kept in the ``store.json``
+    sidecar, the ones growing with the history (``MAPPED_DICT_COLUMNS``) in
+    memory-mapped files read on demand. Rows are ordered by date.
+
+    Each export writes a new ``v<n>`` directory under ``path`` and then
+    replaces the sidecar, which names the current version, in one rename:
+    readers see either the old or the new columns, never a mix. The
+    previous version is kept for the readers that are opening it, older ones
+    are removed.
+
+    Parameters
+    ----------
+    db : DbNeon
+        Database to read the matches from.
+    path : str
+        Directory of the store, created if needed.
+    genders : iterable of str, optional
+        Keep only these genders ("atp", "wta").
+    chunksize : int
+        Number of rows read from the database at once.
+
+    Returns
+    -------
+    MatchStore
+        The exported store, opened.
+    """
+    stat_cols = list(STAT_COLUMNS)
+    read_cols = ["id", "tourney_date", "surface", "gender", "tourney_id"]
+    read_cols += ["winner_id", "loser_id", "score"] + stat_cols
+
+    dtypes = {**STORE_COLUMNS, **{col: STAT_COLUMNS[col] for col in stat_cols}}
+    mappings: Dict[str, Dict[str, int]] = {col: {} for col in DICT_COLUMNS}
+    parts: Dict[str, List[np.ndarray]] = {col: [] for col in dtypes}
+
+    for chunk in db.read_matches(
+        columns=read_cols, genders=genders, chunksize=chunksize
+    ):
+        parts["match_id"].append(chunk["id"].to_numpy("int32"))
+        parts["tourney_date"].append(to_ordinal(chunk["tourney_date"]))
+        parts["surface"].append(chunk["surface"].fillna(0).to_numpy("int8"))
+        for col in DICT_COLUMNS:
+            values = chunk[col].astype(object)
+            parts[col].append(_encode(values, mappings[col], dtypes[col]))
+        for col in ["tourney_id", "winner_id", "loser_id"] + stat_cols:
+            values = pd.to_numeric(chunk[col], errors="coerce").fillna(MISSING)
+            parts[col].append(values.to_numpy(dtypes[col]))
+
+    previous = _read_sidecar(path)
+    version = previous["version"] + 1 if previous else 1
+    version_dir = os.path.join(path, f"v{version}")
+    tmp_dir = f"{version_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)  # left by a failed export
+    os.makedirs(tmp_dir)
+    n_rows = 0
+    for col, dtype in dtypes.items():
+        array = np.concatenate(parts[col]) if parts[col] else np.empty(0, dtype)
+        n_rows = len(array)
+        np.save(os.path.join(tmp_dir, f"{col}.npy"), array)
+    for col in MAPPED_DICT_COLUMNS:
+        _save_strings(tmp_dir, col, list(mappings[col]))
+    os.rename(tmp_dir, version_dir)
+
+    sidecar = {
+        "version": version,
+        "n_rows": n_rows,
+        "columns": dtypes,
+        "dictionaries": {
+            col: list(mapping)
+            for col, mapping in mappings.items()
+            if col not in MAPPED_DICT_COLUMNS
+        },
+        "mapped_dictionaries": MAPPED_DICT_COLUMNS,
+        "surfaces": SURFACE_CODES,
+    }
+    tmp = os.path.join(path, f"{SIDECAR}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, SIDECAR))
+
+    for old_version in range(1, version - 1):
+        shutil.rmtree(os.path.join(path, f"v{old_version}"), ignore_errors=True)
+
+    print(f"Export de {n_rows} matchs dans {path}.")
+    return MatchStore(path)
+
+
+class MatchStore:
+    """
+    Read only access to a match store written by :func:`export_match_store`.
+
+    Every column of the current version is memory-mapped when the store is
+    opened (mapping does not read the data), so every process reading it
+    shares the same page cache and keeps a consistent view of the version it
+    opened while a new export replaces it.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: directory of the store
+        """
+        self.path = path
+        sidecar = _read_sidecar(path)
+        if sidecar is None:
+            raise FileNotFoundError(f"Aucun store de matchs dans {path}.")
+        self.version = sidecar["version"]
+        self.n_rows = sidecar["n_rows"]
+        self.dtypes = sidecar["columns"]
+        self.dictionaries = sidecar["dictionaries"]
+        self.mapped_dictionaries = sidecar.get("mapped_dictionaries", [])
+        version_dir = os.path.join(path, f"v{self.version}")
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+            for name in list(self.dtypes)
+            + [
+                f"{col}.{part}"
+                for col in self.mapped_dictionaries
+                for part in ["offsets", "bytes"]
+            ]
+        }
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.dtypes)
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        if col not in self.dtypes:
+            raise KeyError(f"Colonne inconnue dans le store: {col}")
+        return self._arrays[col]
+
+    def decode(self, col: str) -> np.ndarray:
+        """
+        Values of a dictionary encoded column, None for missing values.
+        """
+        codes = self[col]
+        if col not in self.mapped_dictionaries:
+            values = np.array(self.dictionaries[col] + [None], dtype=object)
+            return values[codes]  # MISSING (-1) picks the trailing None
+
+        # only the strings of the codes used are read from the maps
+        offsets = self._arrays[f"{col}.offsets"]
+        data = self._arrays[f"{col}.bytes"]
+        used, inverse = np.unique(codes, return_inverse=True)
+        values = np.array(
+            [
+                None
+                if code == MISSING
+                else data[offsets[code] : offsets[code + 1]].tobytes().decode("utf-8")
+                for code in used
+            ],
+            dtype=object,
+        )
+        return values[inverse]
+
+    def dates(self) -> np.ndarray:
+        """
+        Tournament dates as ``datetime64[D]``.
+        """
+        return from_ordinal(self["tourney_date"])
+
+    def to_frame(
+        self, columns: Optional[Iterable[str]] = None, decode: bool = False
+    ) -> pd.DataFrame:
+        """
+        Build a DataFrame from some columns of the store.
+
+        The numeric columns are copied from the memory maps; with
+        ``decode=True`` dictionary columns are converted back to strings
+        and ``tourney_date`` to dates.
+        """
+        columns = self.columns if columns is None else list(columns)
+        data = {}
+        for col in columns:
+            if decode and (col in self.dictionaries or col in self.mapped_dictionaries):
+                data[col] = self.decode(col)
+            elif decode and col == "tourney_date":
+                data[col] = self.dates()
+            else:
+                data[col] = np.asarray(self[col])
+        return pd.DataFrame(data)
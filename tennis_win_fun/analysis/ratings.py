@@ -0,0 +1,132 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from tennis_win_fun.analysis.match_store import MatchStore
+
+
+def _replay_elo(
+    winners: list,
+    losers: list,
+    surfaces: Optional[list] = None,
+    k: float = 32.0,
+    offset: float = 5.0,
+    shape: float = 0.0,
+    surface_weight: float = 0.0,
+    initial: float = 1500.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Replay matches in chronological order with an Elo rating.
+
+    Returns the probability given to the winner before each match, and the
+    overall rating of the winner and of the loser after it. See
+    :func:`elo_predictions` for the parameters.
+    """
+    use_surface = surface_weight > 0
+    if surfaces is None:
+        surfaces = [None] * len(winners)
+
+    rating, played, surface_rating = {}, {}, {}
+    proba = np.empty(len(winners))
+    winner_after = np.empty(len(winners))
+    loser_after = np.empty(len(winners))
+    for i, (w, lo, s) in enumerate(zip(winners, losers, surfaces)):
+        rw, rl = rating.get(w, initial), rating.get(lo, initial)
+        diff = rw - rl
+        if use_surface:
+            sw = surface_rating.get((w, s), initial)
+            sl = surface_rating.get((lo, s), initial)
+            diff = (1 - surface_weight) * diff + surface_weight * (sw - sl)
+        p = 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+        proba[i] = p
+
+        nw, nl = played.get(w, 0), played.get(lo, 0)
+        kw = k / (nw + offset) ** shape if shape else k
+        kl = k / (nl + offset) ** shape if shape else k
+        rating[w] = winner_after[i] = rw + kw * (1 - p)
+        rating[lo] = loser_after[i] = rl - kl * (1 - p)
+        if use_surface:
+            surface_rating[(w, s)] = sw + kw * (1 - p)
+            surface_rating[(lo, s)] = sl - kl * (1 - p)
+        played[w], played[lo] = nw + 1, nl + 1
+
+    return proba, winner_after, loser_after
+
+
+def elo_predictions(
+    store: MatchStore,
+    k: float = 32.0,
+    offset: float = 5.0,
+    shape: float = 0.0,
+    surface_weight: float = 0.0,
+    initial: float = 1500.0,
+) -> np.ndarray:
+    """
+    Replay the match history with an Elo rating and return, for every match,
+    the probability given to the winner before the match.
+
+    The K-factor of a player is ``k / (n_matches + offset) ** shape`` (constant
+    ``k`` with the default ``shape=0``). With ``surface_weight`` > 0 the
+    prediction blends the overall rating with a rating kept per surface.
+
+    Parameters
+    ----------
+    store : MatchStore
+        Match history, ordered by date.
+    k, offset, shape : float
+        K-factor parameters.
+    surface_weight : float
+        Weight of the surface rating, between 0 and 1.
+    initial : float
+        Rating of a new player.
+
+    Returns
+    -------
+    np.ndarray
+        float64 array aligned on the rows of the store.
+    """
+    proba, _, _ = _replay_elo(
+        store["winner_id"].tolist(),
+        store["loser_id"].tolist(),
+        store["surface"].tolist(),
+        k,
+        offset,
+        shape,
+        surface_weight,
+        initial,
+    )
+    return proba
+
+
+def elo_history(
+    winner_ids: np.ndarray,
+    loser_ids: np.ndarray,
+    k: float = 32.0,
+    initial: float = 1500.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Replay matches with a constant K Elo rating and return the rating of the
+    winner and of the loser after each match.
+
+    Parameters
+    ----------
+    winner_ids, loser_ids : array-like
+        Players of each match, in chronological order.
+    k : float
+        K-factor.
+    initial : float
+        Rating of a new player.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        float64 ratings of the winners and of the losers, aligned on the
+        matches.
+    """
+    _, winner_after, loser_after = _replay_elo(
+        np.asarray(winner_ids).tolist(),
+        np.asarray(loser_ids).tolist(),
+        k=k,
+        initial=initial,
+    )
+    return winner_after, loser_after
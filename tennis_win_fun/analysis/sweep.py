@@ -0,0 +1,127 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tennis_win_fun.analysis.match_store import MatchStore, to_ordinal
+
+# Store opened once per worker process, see _init_worker.
+_STORE: Optional[MatchStore] = None
+
+Model = Callable[..., np.ndarray]
+
+
+def param_grid(**params: List) -> List[Dict]:
+    """
+    Cartesian product of parameter values.
+
+    Examples
+    --------
+    >>> param_grid(k=[16, 32], surface_weight=[0.0, 0.5])[1]
+    {'k': 16, 'surface_weight': 0.5}
+    """
+    keys = list(params)
+    return [dict(zip(keys, values)) for values in itertools.product(*params.values())]
+
+
+def evaluate(
+    proba: np.ndarray, store: MatchStore, eval_from: Optional[date] = None
+) -> Dict[str, float]:
+    """
+    Score the probabilities given to the winners of the matches.
+
+    Parameters
+    ----------
+    proba : np.ndarray
+        Probability given to the winner of each match of the store.
+    store : MatchStore
+        Match history the probabilities were computed on.
+    eval_from : date, optional
+        Ignore the matches before this date (rating burn-in).
+
+    Returns
+    -------
+    dict
+        ``n_matches``, ``log_loss``, ``brier`` and ``accuracy``.
+    """
+    mask = np.ones(len(proba), dtype=bool)
+    if eval_from is not None:
+        start = to_ordinal(pd.Series([eval_from]))[0]
+        mask &= np.asarray(store["tourney_date"]) >= start
+    p = np.clip(proba[mask], 1e-12, 1 - 1e-12)
+
+    return {
+        "n_matches": int(mask.sum()),
+        "log_loss": float(-np.log(p).mean()),
+        "brier": float(((1 - p) ** 2).mean()),
+        "accuracy": float((p > 0.5).mean()),
+    }
+
+
+def _init_worker(store_path: str):
+    global _STORE
+    _STORE = MatchStore(store_path)
+
+
+def _run_config(model: Model, params: Dict, eval_from: Optional[date]) -> Dict:
+    proba = model(_STORE, **params)
+    return {**params, **evaluate(proba, _STORE, eval_from)}
+
+
+def run_sweep(
+    store_path: str,
+    model: Model,
+    configs: List[Dict],
+    eval_from: Optional[date] = None,
+    processes: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Evaluate a model for many parameter configurations in parallel.
+
+    Every worker process memory-maps the match store once (see
+    :func:`~tennis_win_fun.analysis.match_store.export_match_store`), so the
+    match history is shared through the page cache instead of being copied
+    to each worker or reloaded from the database for each configuration.
+
+    Parameters
+    ----------
+    store_path : str
+        Directory of the match store.
+    model : callable
+        Module level function ``model(store, **params)`` returning the
+        probability given to the winner of each match, e.g.
+        :func:`~tennis_win_fun.analysis.ratings.elo_predictions`.
+    configs : list of dict
+        Parameters of each run, see :func:`param_grid`.
+    eval_from : date, optional
+        Ignore the matches before this date in the metrics.
+    processes : int, optional
+        Number of worker processes, default is the number of CPUs.
+        With 1 the configurations run in the current process.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per configuration: its parameters and the metrics of
+        :func:`evaluate`, sorted by log loss.
+    """
+    processes = processes or os.cpu_count() or 1
+    print(f"Évaluation de {len(configs)} configurations sur {processes} processus...")
+
+    if processes == 1:
+        _init_worker(store_path)
+        results = [_run_config(model, params, eval_from) for params in configs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker, initargs=(store_path,)
+        ) as pool:
+            futures = [
+                pool.submit(_run_config, model, params, eval_from) for params in configs
+            ]
+            results = [future.result() for future in futures]
+
+    return pd.DataFrame(results).sort_values("log_loss").reset_index(drop=True)
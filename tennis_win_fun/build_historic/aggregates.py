@@ -0,0 +1,129 @@
+import pandas as pd
+
+# Games of a set, "7-6(5)" has the tiebreak points of the loser of the set.
+# Match tiebreaks written "[10-8]" are not sets and are skipped.
+SET_PATTERN = r"(?<![\[\d])(\d+)-(\d+)(?:\((\d+)\))?"
+
+# Serve stats of the matches table, without their w_/l_ prefix, and the
+# player_season_stats counter they are summed in.
+SERVE_STATS = {
+    "ace": "aces",
+    "df": "double_faults",
+    "svpt": "serve_points",
+    "1stIn": "first_serves_in",
+    "1stWon": "first_serves_won",
+    "2ndWon": "second_serves_won",
+    "SvGms": "service_games",
+    "bpSaved": "break_points_saved",
+    "bpFaced": "break_points_faced",
+}
+SERVE_STAT_COLS = [f"{p}_{stat}" for p in ["w", "l"] for stat in SERVE_STATS]
+
+# Counters of the player_season_stats table.
+AGGREGATE_COLS = [
+    "matches",
+    "wins",
+    "losses",
+    "sets_won",
+    "sets_lost",
+    "games_won",
+    "games_lost",
+    "tiebreaks_won",
+    "tiebreaks_lost",
+] + list(SERVE_STATS.values())
+
+
+def parse_scores(scores: pd.Series) -> pd.DataFrame:
+    """
+    Count sets, games and tiebreaks of the winner (``w_``) and the loser
+    (``l_``) of each match from its score string.
+
+    Parameters
+    ----------
+    scores : pd.Series
+        Scores as in the historic data ("7-6(5) 6-4", "6-1 RET", "W/O"...).
+
+    Returns
+    -------
+    pd.DataFrame
+        Integer counts aligned on ``scores.index``.
+    """
+    sets = scores.astype("string").str.extractall(SET_PATTERN)
+    w_games = sets[0].astype(int)
+    l_games = sets[1].astype(int)
+    high = w_games.where(w_games > l_games, l_games)
+    lead = abs(w_games - l_games)
+    # 7-6, or 13-12 in the final sets decided by a tiebreak at 12-12
+    tiebreak = (lead == 1) & (high >= 7)
+    # the set in progress at a retirement ("6-4 2-1 RET") only counts games
+    complete = ((high >= 6) & (lead >= 2)) | tiebreak
+
+    per_set = pd.DataFrame(
+        {
+            "w_sets": complete & (w_games > l_games),
+            "l_sets": complete & (l_games > w_games),
+            "w_games": w_games,
+            "l_games": l_games,
+            "w_tiebreaks": tiebreak & (w_games > l_games),
+            "l_tiebreaks": tiebreak & (l_games > w_games),
+        }
+    ).astype(int)
+
+    counts = per_set.groupby(level=0).sum()
+    return counts.reindex(scores.index, fill_value=0)
+
+
+def player_season_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate matches per player, season and surface.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Matches with ``winner_id``, ``loser_id``, ``score``, ``season`` and
+        ``surface`` (surface code) columns, and the ``SERVE_STAT_COLS``
+        when available (missing stats count as 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (joueur_id, season, surface) with the ``AGGREGATE_COLS``.
+    """
+    counts = parse_scores(df["score"])
+    keys = df[["season", "surface"]]
+
+    winners = keys.assign(
+        joueur_id=df["winner_id"],
+        wins=1,
+        losses=0,
+        sets_won=counts["w_sets"],
+        sets_lost=counts["l_sets"],
+        games_won=counts["w_games"],
+        games_lost=counts["l_games"],
+        tiebreaks_won=counts["w_tiebreaks"],
+        tiebreaks_lost=counts["l_tiebreaks"],
+    )
+    losers = keys.assign(
+        joueur_id=df["loser_id"],
+        wins=0,
+        losses=1,
+        sets_won=counts["l_sets"],
+        sets_lost=counts["w_sets"],
+        games_won=counts["l_games"],
+        games_lost=counts["w_games"],
+        tiebreaks_won=counts["l_tiebreaks"],
+        tiebreaks_lost=counts["w_tiebreaks"],
+    )
+    for stat, counter in SERVE_STATS.items():
+        for side, prefix in [(winners, "w"), (losers, "l")]:
+            col = f"{prefix}_{stat}"
+            values = df[col] if col in df.columns else 0
+            side[counter] = pd.to_numeric(values, errors="coerce")
+    long = pd.concat([winners, losers], ignore_index=True).assign(matches=1)
+    long[AGGREGATE_COLS] = long[AGGREGATE_COLS].fillna(0).astype("int64")
+
+    return (
+        long.groupby(["joueur_id", "season", "surface"])[AGGREGATE_COLS]
+        .sum()
+        .reset_index()
+    )
@@ -4,6 +4,7 @@ from typing import List
 import pandas as pd
 
 from tennis_win_fun.build_historic.models import DbNeon
+from tennis_win_fun.build_historic.profiling import NoProfiler
 
 
 class BuildHistoric:
@@ -11,10 +12,11 @@ class BuildHistoric:
     Class to build all historic data from csv files.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, profiler=None):
         """
         Initialize the BuildHistoric class.
         :param db: Database handler instance, if None will create DbNeon instance internally
+        :param profiler: StageProfiler profiling each stage of the runs, None to disable
         """
         self.dossier_csv = "../tennis_win_fun/tennis_win_fun/historic_data"
         self.all_cols = [
@@ -71,13 +73,37 @@ class BuildHistoric:
 
         self.match_cols = [
             "tourney_id",
-            "winner_seed",
+            "surface",
             "winner_entry",
             "winner_name",
-            "loser_seed",
             "loser_entry",
             "loser_name",
             "score",
+            "best_of",
+            "round",
+            "minutes",
+            "w_ace",
+            "w_df",
+            "w_svpt",
+            "w_1stIn",
+            "w_1stWon",
+            "w_2ndWon",
+            "w_SvGms",
+            "w_bpSaved",
+            "w_bpFaced",
+            "l_ace",
+            "l_df",
+            "l_svpt",
+            "l_1stIn",
+            "l_1stWon",
+            "l_2ndWon",
+            "l_SvGms",
+            "l_bpSaved",
+            "l_bpFaced",
+            "winner_rank",
+            "winner_rank_points",
+            "loser_rank",
+            "loser_rank_points",
         ]
 
         self.tournament_cols = [
@@ -106,6 +132,8 @@ class BuildHistoric:
         else:
             self.db = db
 
+        self.profiler = profiler if profiler is not None else NoProfiler()
+
     def get_historic_from_csv(self, gender: str = "wta") -> pd.DataFrame:
         """
         Read and concatenate all historic data from CSV files in the specified directory.
@@ -198,12 +226,12 @@ class BuildHistoric:
     def _load_and_build_players(self, gender: str) -> pd.DataFrame:
         print(f"Chargement et construction des joueurs pour {gender.upper()}...")
         df = self.get_historic_from_csv(gender)
-        return self.build_players(df)
+        return self.build_players(df).assign(gender=gender)
 
     def _load_and_build_tourney(self, gender: str) -> pd.DataFrame:
         print(f"Chargement et construction des tournois pour {gender.upper()}...")
         df = self.get_historic_from_csv(gender)
-        return self.build_tourney(df)
+        return self.build_tourney(df).assign(gender=gender)
 
     def run(self, genders=None):
         """
@@ -222,23 +250,32 @@ class BuildHistoric:
         tourney_dfs = []
 
         for gender in genders:
-            df_players = self._load_and_build_players(gender)
+            with self.profiler.stage(f"build_players_{gender}"):
+                df_players = self._load_and_build_players(gender)
             players_dfs.append(df_players)
 
-            df_tourney = self._load_and_build_tourney(gender)
+            with self.profiler.stage(f"build_tourney_{gender}"):
+                df_tourney = self._load_and_build_tourney(gender)
             tourney_dfs.append(df_tourney)
 
-        print("Concaténation des données joueurs...")
-        df_players_all = pd.concat(players_dfs).drop_duplicates().reset_index(drop=True)
-        print(f"Nombre total de joueurs uniques : {len(df_players_all)}")
+        with self.profiler.stage("concat_dedup"):
+            print("Concaténation des données joueurs...")
+            df_players_all = (
+                pd.concat(players_dfs).drop_duplicates().reset_index(drop=True)
+            )
+            print(f"Nombre total de joueurs uniques : {len(df_players_all)}")
 
-        print("Concaténation des données tournois...")
-        df_tourney_all = pd.concat(tourney_dfs).drop_duplicates().reset_index(drop=True)
-        print(f"Nombre total de tournois uniques : {len(df_tourney_all)}")
+            print("Concaténation des données tournois...")
+            df_tourney_all = (
+                pd.concat(tourney_dfs).drop_duplicates().reset_index(drop=True)
+            )
+            print(f"Nombre total de tournois uniques : {len(df_tourney_all)}")
 
         print("Écriture des données dans la base...")
-        self.db.write_players(df_players_all)
-        self.db.write_tourney(df_tourney_all)
+        with self.profiler.stage("write_players"):
+            self.db.write_players(df_players_all)
+        with self.profiler.stage("write_tourney"):
+            self.db.write_tourney(df_tourney_all)
 
         print("Processus terminé avec succès.")
 
@@ -265,37 +302,57 @@ class BuildHistoric:
         matchs_dfs = []
 
         for gender in genders:
-            df = self.get_historic_from_csv(gender)
-            matchs_dfs.append(df)
-
-        # concatenate all match data
-        print("Concaténation des données de matchs...")
-        df_matchs_all = pd.concat(matchs_dfs, ignore_index=True)
-        print(f"Nombre total de matchs : {len(df_matchs_all)}")
-
-        # keep only the columns that are needed for the match data
-        df_matchs_all = (
-            df_matchs_all[self.match_cols].drop_duplicates().reset_index(drop=True)
-        )
+            with self.profiler.stage(f"read_csv_{gender}"):
+                df = self.get_historic_from_csv(gender)
+            matchs_dfs.append(df.assign(gender=gender))
+
+        with self.profiler.stage("concat_dedup"):
+            # concatenate all match data
+            print("Concaténation des données de matchs...")
+            df_matchs_all = pd.concat(matchs_dfs, ignore_index=True)
+            print(f"Nombre total de matchs : {len(df_matchs_all)}")
+
+            # keep only the columns that are needed for the match data
+            df_matchs_all = (
+                df_matchs_all[self.match_cols + ["gender"]]
+                .drop_duplicates()
+                .reset_index(drop=True)
+            )
 
-        # Read the players and tournaments from the database
-        df_players = self.db.read_players()
-        df_tourney = self.db.read_tourneys()
+        with self.profiler.stage("read_db"):
+            # Read only the id cols to join from the database
+            df_players = self.db.read_players(columns=["id", "name", "ioc"])
+            df_tourney = self.db.read_tourneys(
+                columns=["id", "tourney_id", "gender"],
+                tourney_ids=df_matchs_all["tourney_id"].dropna().unique(),
+            )
 
-        # select id cols to join
-        df_players = df_players[["id", "name", "ioc"]]
-        df_tourney = df_tourney[["id", "tourney_id"]]
-        # join players and tournaments to the match data
-        df_matchs_all = df_matchs_all.merge(
-            df_players, left_on="winner_name", right_on="name", how="left"
-        )
-        # rename columns to avoid confusion
-        df_matchs_all.rename(columns={"id": "winner_id"}, inplace=True)
-        df_matchs_all = df_matchs_all.merge(
-            df_players, left_on="loser_name", right_on="name", how="left"
-        )
-        df_matchs_all.rename(columns={"id": "loser_id"}, inplace=True)
-        df_matchs_all = df_matchs_all.merge(df_tourney, on="tourney_id", how="left")
+        with self.profiler.stage("merge"):
+            # join players and tournaments to the match data
+            df_matchs_all = df_matchs_all.merge(
+                df_players, left_on="winner_name", right_on="name", how="left"
+            )
+            # rename columns to avoid confusion
+            df_matchs_all.rename(columns={"id": "winner_id"}, inplace=True)
+            df_matchs_all = df_matchs_all.merge(
+                df_players, left_on="loser_name", right_on="name", how="left"
+            )
+            df_matchs_all.rename(columns={"id": "loser_id"}, inplace=True)
+            # matches reference the id of the tournois table, Grand Slams
+            # have one row per gender under the same source tourney_id
+            df_tourney["gender"] = df_tourney["gender"].astype(object)
+            df_matchs_all = df_matchs_all.merge(
+                df_tourney.rename(columns={"id": "tourney_pk"}),
+                on=["tourney_id", "gender"],
+                how="left",
+            )
+            df_matchs_all["tourney_id"] = df_matchs_all.pop("tourney_pk")
 
         # write the match data to the database
-        self.db.write_matches(df_matchs_all)
+        with self.profiler.stage("write_matches"):
+            df_changed = self.db.write_matches(df_matchs_all)
+
+        # refresh the aggregates of the players of the written matches only
+        print(f"Mise à jour des agrégats pour {len(df_changed)} matchs...")
+        with self.profiler.stage("refresh_aggregates"):
+            self.db.refresh_player_season_stats(df_changed)
@@ -1,17 +1,49 @@
 import logging
+import re
 from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
 
 import pandas as pd
 from sqlalchemy import (
+    BigInteger,
     Column,
     Date,
+    DateTime,
+    Float,
+    ForeignKey,
     Integer,
+    MetaData,
+    SmallInteger,
     String,
+    Table,
     UniqueConstraint,
+    bindparam,
     create_engine,
+    delete,
+    func,
+    inspect,
+    or_,
+    select,
+    text,
+    tuple_,
 )
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from tennis_win_fun.build_historic.aggregates import (
+    SERVE_STAT_COLS,
+    player_season_aggregates,
+)
+
 # Configuration du logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,13 +55,20 @@ class Tournoi(Base):
     __tablename__ = "tournois"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    tourney_id = Column(String, unique=True, nullable=True)
+    tourney_id = Column(String, nullable=True)
     tourney_name = Column(String, nullable=False)
     surface = Column(String)
     draw_size = Column(Integer)
     tourney_level = Column(String)
-    tourney_date = Column(Date)
+    tourney_date = Column(Date, index=True)
     tourney_start_date = Column(Date)
+    gender = Column(String)  # "atp" or "wta"
+    row_hash = Column(BigInteger)  # fingerprint of the source row
+
+    # ATP and WTA editions of a Grand Slam share the same source tourney_id
+    __table_args__ = (
+        UniqueConstraint("tourney_id", "gender", name="_tourney_gender_uc"),
+    )
 
 
 class Joueur(Base):
@@ -40,43 +79,368 @@ class Joueur(Base):
     hand = Column(String)
     ht = Column(Integer)
     ioc = Column(String)
+    gender = Column(String, index=True)  # "atp" or "wta"
+    row_hash = Column(BigInteger)  # fingerprint of the source row
 
     __table_args__ = (UniqueConstraint("name", "ioc", name="_name_ioc_uc"),)
 
 
+class JoueurAlias(Base):
+    """
+    Alternative spelling of a player name (other data source, accents,
+    initials...) resolved to a row of the joueurs table.
+    ``alias`` is stored normalized, ``ioc`` is an empty string when unknown.
+    """
+
+    __tablename__ = "joueurs_alias"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    alias = Column(String, nullable=False)
+    ioc = Column(String, nullable=False, default="")
+    joueur_id = Column(Integer, ForeignKey("joueurs.id"), nullable=False)
+    score = Column(Float)
+    source = Column(String)
+
+    __table_args__ = (UniqueConstraint("alias", "ioc", name="_alias_ioc_uc"),)
+
+
 class Match(Base):
     """
     Represents a tennis match between two players in a tournament.
     The match is uniquely identified by the combination of tourney_id, winner_id, and loser_id.
-    expected_cols= [
-            "tourney_id",
-            "winner_seed",
-            "winner_entry",
-            "winner_name",
-            "loser_seed",
-            "loser_entry",
-            "loser_name",
-            "score",
-        ]
+    Names and tournament details are not repeated here: tourney_id, winner_id
+    and loser_id reference tournois.id and joueurs.id, round and surface are
+    stored as ROUND_CODES / SURFACE_CODES and stats as small integers.
+    expected_cols = ["tourney_id", "winner_id", "loser_id"] + MATCH_HASH_COLS
+
+    Matches are partitioned by season (year of the tournament date, 0 when
+    unknown): on Postgres the table is range partitioned on ``season`` with
+    one ``matches_<season>`` partition per year, on SQLite every season is
+    stored in its own ``matches_<season>`` table with this layout and the
+    ``matches`` table itself is not created. See ``DbNeon.match_tables``.
     """
 
     __tablename__ = "matches"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    tourney_id = Column(String, nullable=False)
-    winner_id = Column(Integer, nullable=False)  # winner_id
-    loser_id = Column(Integer, nullable=False)  # loser_id
+    season = Column(SmallInteger, primary_key=True, autoincrement=False)
+    tourney_id = Column(Integer, ForeignKey("tournois.id"), nullable=False)
+    winner_id = Column(Integer, ForeignKey("joueurs.id"), nullable=False)
+    loser_id = Column(Integer, ForeignKey("joueurs.id"), nullable=False)
     winner_entry = Column(String)  # winner_entry
     loser_entry = Column(String)  # loser_entry
-    winner_name = Column(String)  # winner_name
-    loser_name = Column(String)  # loser_name
     score = Column(String)  # match score
+    round = Column(SmallInteger)  # ROUND_CODES, 0 is unknown
+    surface = Column(SmallInteger)  # SURFACE_CODES, 0 is unknown
+    best_of = Column(SmallInteger)
+    minutes = Column(SmallInteger)
+    w_ace = Column(SmallInteger)
+    w_df = Column(SmallInteger)
+    w_svpt = Column(SmallInteger)
+    w_1stIn = Column(SmallInteger)
+    w_1stWon = Column(SmallInteger)
+    w_2ndWon = Column(SmallInteger)
+    w_SvGms = Column(SmallInteger)
+    w_bpSaved = Column(SmallInteger)
+    w_bpFaced = Column(SmallInteger)
+    l_ace = Column(SmallInteger)
+    l_df = Column(SmallInteger)
+    l_svpt = Column(SmallInteger)
+    l_1stIn = Column(SmallInteger)
+    l_1stWon = Column(SmallInteger)
+    l_2ndWon = Column(SmallInteger)
+    l_SvGms = Column(SmallInteger)
+    l_bpSaved = Column(SmallInteger)
+    l_bpFaced = Column(SmallInteger)
+    winner_rank = Column(SmallInteger)
+    winner_rank_points = Column(Integer)
+    loser_rank = Column(SmallInteger)
+    loser_rank_points = Column(Integer)
+    row_hash = Column(BigInteger)  # fingerprint of the source row
+
+    __table_args__ = (
+        # a unique constraint of a partitioned table must hold the partition key
+        UniqueConstraint(
+            "season", "tourney_id", "winner_id", "loser_id", name="_match_uc"
+        ),
+        {"postgresql_partition_by": "RANGE (season)"},
+    )
+
+
+class LiveScore(Base):
+    """
+    Last known state of an in-progress match, fed by the live watcher.
+    """
+
+    __tablename__ = "live_scores"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String, unique=True, nullable=False)  # id of the source
+    tourney_name = Column(String)
+    round = Column(String)
+    status = Column(String)
+    home_name = Column(String)
+    away_name = Column(String)
+    home_id = Column(Integer, ForeignKey("joueurs.id"))
+    away_id = Column(Integer, ForeignKey("joueurs.id"))
+    score = Column(String)
+    home_odds = Column(Float)
+    away_odds = Column(Float)
+    row_hash = Column(BigInteger)  # fingerprint of the source row
+    updated_at = Column(DateTime)
+
+
+class PlayerSeasonStats(Base):
+    """
+    Pre-aggregated results of a player for a season on a surface.
+    Refreshed incrementally from the written matches, see
+    ``DbNeon.refresh_player_season_stats``.
+    """
+
+    __tablename__ = "player_season_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    joueur_id = Column(Integer, ForeignKey("joueurs.id"), nullable=False)
+    season = Column(SmallInteger, nullable=False)
+    surface = Column(SmallInteger, nullable=False)  # SURFACE_CODES, 0 is unknown
+    matches = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    sets_won = Column(Integer, nullable=False, default=0)
+    sets_lost = Column(Integer, nullable=False, default=0)
+    games_won = Column(Integer, nullable=False, default=0)
+    games_lost = Column(Integer, nullable=False, default=0)
+    tiebreaks_won = Column(Integer, nullable=False, default=0)
+    tiebreaks_lost = Column(Integer, nullable=False, default=0)
+    aces = Column(Integer, nullable=False, default=0)
+    double_faults = Column(Integer, nullable=False, default=0)
+    serve_points = Column(Integer, nullable=False, default=0)
+    first_serves_in = Column(Integer, nullable=False, default=0)
+    first_serves_won = Column(Integer, nullable=False, default=0)
+    second_serves_won = Column(Integer, nullable=False, default=0)
+    service_games = Column(Integer, nullable=False, default=0)
+    break_points_saved = Column(Integer, nullable=False, default=0)
+    break_points_faced = Column(Integer, nullable=False, default=0)
 
     __table_args__ = (
-        UniqueConstraint("tourney_id", "winner_id", "loser_id", name="_match_uc"),
+        UniqueConstraint("joueur_id", "season", "surface", name="_player_season_uc"),
     )
 
 
+# Integer codes of the surfaces, 0 is unknown.
+SURFACE_CODES = {"Hard": 1, "Clay": 2, "Grass": 3, "Carpet": 4}
+
+# Integer codes of the rounds, 0 is unknown.
+ROUND_CODES = {
+    "R128": 1,
+    "R64": 2,
+    "R32": 3,
+    "R16": 4,
+    "QF": 5,
+    "SF": 6,
+    "F": 7,
+    "RR": 8,  # round robin
+    "BR": 9,  # bronze medal match
+    "ER": 10,
+    "Q1": 11,
+    "Q2": 12,
+    "Q3": 13,
+}
+
+# Match statistics stored as small integers.
+MATCH_STAT_COLS = [
+    "best_of",
+    "minutes",
+    "w_ace",
+    "w_df",
+    "w_svpt",
+    "w_1stIn",
+    "w_1stWon",
+    "w_2ndWon",
+    "w_SvGms",
+    "w_bpSaved",
+    "w_bpFaced",
+    "l_ace",
+    "l_df",
+    "l_svpt",
+    "l_1stIn",
+    "l_1stWon",
+    "l_2ndWon",
+    "l_SvGms",
+    "l_bpSaved",
+    "l_bpFaced",
+    "winner_rank",
+    "winner_rank_points",
+    "loser_rank",
+    "loser_rank_points",
+]
+
+# Compact dtypes used when reading tables back into pandas.
+PLAYER_DTYPES = {
+    "id": "int32",
+    "name": "string",
+    "hand": "category",
+    "ht": "Int16",
+    "ioc": "category",
+    "gender": "category",
+}
+
+TOURNEY_DTYPES = {
+    "id": "int32",
+    "tourney_id": "string",
+    "tourney_name": "category",
+    "surface": "category",
+    "draw_size": "Int16",
+    "tourney_level": "category",
+    "tourney_date": "datetime64[ns]",
+    "tourney_start_date": "datetime64[ns]",
+    "gender": "category",
+}
+
+MATCH_DTYPES = {
+    "id": "int32",
+    "season": "int16",
+    "tourney_id": "int32",
+    "winner_id": "int32",
+    "loser_id": "int32",
+    "winner_entry": "category",
+    "loser_entry": "category",
+    "score": "string",
+    "round": "Int8",
+    "surface": "Int8",
+    "best_of": "Int8",
+    **{col: "Int16" for col in MATCH_STAT_COLS if col != "best_of"},
+    "winner_rank_points": "Int32",
+    "loser_rank_points": "Int32",
+    "tourney_date": "datetime64[ns]",
+    "gender": "category",
+}
+
+# Name of the partition (Postgres) or table (SQLite) of a season of matches.
+MATCH_PARTITION_PATTERN = re.compile(r"^matches_(\d+)$")
+
+
+def match_partition_name(season: int) -> str:
+    return f"matches_{int(season)}"
+
+
+# Tournament columns available when reading matches.
+MATCH_TOURNEY_COLS = ["tourney_date", "gender"]
+
+PLAYER_SEASON_DTYPES = {
+    "id": "int32",
+    "joueur_id": "int32",
+    "season": "int16",
+    "surface": "int8",
+    "matches": "int32",
+    "wins": "int32",
+    "losses": "int32",
+    "sets_won": "int32",
+    "sets_lost": "int32",
+    "games_won": "int32",
+    "games_lost": "int32",
+    "tiebreaks_won": "int32",
+    "tiebreaks_lost": "int32",
+    "aces": "int32",
+    "double_faults": "int32",
+    "serve_points": "int32",
+    "first_serves_in": "int32",
+    "first_serves_won": "int32",
+    "second_serves_won": "int32",
+    "service_games": "int32",
+    "break_points_saved": "int32",
+    "break_points_faced": "int32",
+}
+
+ALIAS_DTYPES = {
+    "id": "int32",
+    "alias": "string",
+    "ioc": "category",
+    "joueur_id": "int32",
+    "score": "float32",
+    "source": "category",
+}
+
+
+# Columns whose content is fingerprinted in row_hash, keys excluded.
+PLAYER_HASH_COLS = ["hand", "ht", "gender"]
+TOURNEY_HASH_COLS = [
+    "tourney_name",
+    "surface",
+    "draw_size",
+    "tourney_level",
+    "tourney_date",
+    "tourney_start_date",
+]
+MATCH_HASH_COLS = [
+    "winner_entry",
+    "loser_entry",
+    "score",
+    "round",
+    "surface",
+] + MATCH_STAT_COLS
+
+
+LIVE_HASH_COLS = [
+    "tourney_name",
+    "round",
+    "status",
+    "home_name",
+    "away_name",
+    "home_id",
+    "away_id",
+    "score",
+    "home_odds",
+    "away_odds",
+]
+
+
+def compute_row_hash(df: pd.DataFrame, cols: Sequence[str]) -> pd.Series:
+    """
+    Compute a 64 bit fingerprint of the ``cols`` values of each row.
+
+    The hash is vectorized (``pd.util.hash_pandas_object``) and stable between
+    runs, so comparing it with the stored ``row_hash`` tells if a source row
+    changed without comparing every column.
+
+    Returns
+    -------
+    pd.Series
+        int64 Series aligned on ``df.index``.
+    """
+    values = df[list(cols)].astype("string").fillna("\x00")
+    hashed = pd.util.hash_pandas_object(values, index=False)
+    return pd.Series(hashed.to_numpy().view("int64"), index=df.index)
+
+
+def _to_records(df: pd.DataFrame) -> list:
+    """
+    Convert a DataFrame to a list of dicts with None instead of NaN/NA.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _to_compact(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Cast the columns of ``df`` listed in ``dtypes`` to their compact dtype.
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+class SyncResult(NamedTuple):
+    inserted: int
+    updated: int
+    ignored: int
+    changed: pd.DataFrame  # keys of the inserted or updated rows
+
+
 class DbNeon:
     def __init__(self, db_url: str = "sqlite:///tennis.db"):
         print(f"[DEBUG] db_url = {db_url!r}")
@@ -84,7 +448,20 @@ class DbNeon:
         self.engine = create_engine(db_url, echo=False, future=True)
         logger.info(f"[DB INIT] Connexion à la base : {self.engine.url}")
 
-        Base.metadata.create_all(self.engine)
+        # Postgres routes the rows of the partitioned matches table itself,
+        # other databases get one matches_<season> table per season
+        self.season_tables = self.engine.dialect.name != "postgresql"
+        self._partitions: Dict[int, Table] = {}
+        self._partition_metadata = MetaData()
+        for table in [Tournoi.__table__, Joueur.__table__]:
+            table.to_metadata(self._partition_metadata)  # targets of the FKs
+
+        tables = [
+            table
+            for table in Base.metadata.sorted_tables
+            if not (self.season_tables and table is Match.__table__)
+        ]
+        Base.metadata.create_all(self.engine, tables=tables)
         self.Session = sessionmaker(bind=self.engine, future=True)
 
     @contextmanager
@@ -99,41 +476,179 @@ class DbNeon:
         finally:
             session.close()
 
-    def write_players(self, df: pd.DataFrame):
+    def _sync_rows(
+        self,
+        model,
+        df: pd.DataFrame,
+        key_cols: List[str],
+        hash_cols: List[str],
+        filters: Sequence = (),
+        assign_ids: bool = False,
+    ) -> "SyncResult":
         """
-        Insert players from a DataFrame into the joueurs table,
-        avoiding duplicates on (name, ioc).
+        Insert new rows of ``df`` in the ``model`` table and update the existing
+        rows whose fingerprint changed.
+
+        Rows are matched on ``key_cols``, ``row_hash`` is computed on
+        ``hash_cols`` and compared with the stored one, unchanged rows are
+        ignored.
+
+        Parameters
+        ----------
+        model : declarative class or Table
+            Target table.
+        filters : sequence of SQL expressions
+            Restrict the lookup of the existing rows (partition pruning).
+        assign_ids : bool
+            Give the new rows the ids following the highest match id instead
+            of letting the table generate them (season tables).
+
+        Returns
+        -------
+        SyncResult
+            Number of inserted, updated and ignored rows, and the keys of the
+            inserted or updated rows.
         """
-        df = df[["name", "hand", "ht", "ioc"]].drop_duplicates()
-        inserted = 0
+        df = df.drop_duplicates(subset=key_cols).reset_index(drop=True)
+        df["row_hash"] = compute_row_hash(df, hash_cols)
 
-        with self.session_scope() as session:
-            for _, row in df.iterrows():
-                if pd.isna(row["name"]) or pd.isna(row["ioc"]):
-                    continue  # ignore invalid rows
+        table = getattr(model, "__table__", model)
+        stmt = select(*[table.c[col] for col in key_cols], table.c.id).add_columns(
+            table.c.row_hash.label("_stored_hash")
+        )
+        for clause in filters:
+            stmt = stmt.where(clause)
+        with self.engine.connect() as conn:
+            existing = pd.read_sql(stmt, conn)
+        existing = existing.astype({col: df[col].dtype for col in key_cols})
+        existing = existing.astype({"id": "Int64", "_stored_hash": "Int64"})
+        df = df.merge(existing, on=key_cols, how="left")
 
-                exists = (
-                    session.query(Joueur)
-                    .filter_by(name=row["name"], ioc=row["ioc"])
-                    .first()
+        is_new = df["id"].isna()
+        is_changed = ~is_new & (df["row_hash"] != df["_stored_hash"]).fillna(True)
+        to_insert = df.loc[is_new].drop(columns=["id", "_stored_hash"])
+        to_update = df.loc[is_changed].drop(columns=["_stored_hash"])
+        to_update["id"] = to_update["id"].astype("int64")
+        if assign_ids:
+            first_id = self._next_match_id()
+            to_insert.insert(0, "id", range(first_id, first_id + len(to_insert)))
+
+        with self.engine.begin() as conn:
+            if not to_insert.empty:
+                conn.execute(table.insert(), _to_records(to_insert))
+            if not to_update.empty:
+                # the primary key columns locate the row (and its partition)
+                pk_cols = [col.name for col in table.primary_key.columns]
+                stmt = table.update().values(
+                    {
+                        col: bindparam(f"b_{col}")
+                        for col in to_update.columns
+                        if col not in pk_cols
+                    }
                 )
-                if not exists:
-                    player = Joueur(
-                        name=row["name"],
-                        hand=row["hand"] if pd.notna(row["hand"]) else None,
-                        ht=int(row["ht"]) if pd.notna(row["ht"]) else None,
-                        ioc=row["ioc"],
+                for col in pk_cols:
+                    stmt = stmt.where(table.c[col] == bindparam(f"b_{col}"))
+                conn.execute(stmt, _to_records(to_update.add_prefix("b_")))
+
+        changed = pd.concat(
+            [to_insert[key_cols], to_update[key_cols]], ignore_index=True
+        )
+        ignored = len(df) - len(to_insert) - len(to_update)
+        return SyncResult(len(to_insert), len(to_update), ignored, changed)
+
+    def match_partition(self, season: int) -> Table:
+        """
+        Table the matches of ``season`` are written to, created if needed.
+
+        On Postgres this is the partitioned ``matches`` table, after making
+        sure its ``matches_<season>`` partition exists; elsewhere it is the
+        ``matches_<season>`` table.
+        """
+        season = int(season)
+        if season in self._partitions:
+            return self._partitions[season]
+
+        name = match_partition_name(season)
+        if self.season_tables:
+            table = Match.__table__.to_metadata(self._partition_metadata, name=name)
+            table.c.id.autoincrement = False  # ids are given by _next_match_id
+            table.create(self.engine, checkfirst=True)
+        else:
+            table = Match.__table__
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF matches "
+                        f"FOR VALUES FROM ({season}) TO ({season + 1})"
                     )
-                    session.add(player)
-                    inserted += 1
+                )
+        self._partitions[season] = table
+        return table
+
+    def match_tables(
+        self, first_season: Optional[int] = None, last_season: Optional[int] = None
+    ) -> List[Table]:
+        """
+        Tables to read for the matches of the seasons between ``first_season``
+        and ``last_season`` (inclusive), ordered by season.
+
+        Postgres prunes the partitions itself from the ``season`` condition of
+        the queries, the partitioned table is returned; elsewhere the
+        ``matches_<season>`` tables of the range are listed.
+        """
+        if not self.season_tables:
+            return [Match.__table__]
 
-        logger.info(f"{inserted} joueurs insérés, {len(df) - inserted} ignorés.")
+        seasons = []
+        for name in inspect(self.engine).get_table_names():
+            found = MATCH_PARTITION_PATTERN.match(name)
+            if found is None:
+                continue
+            season = int(found.group(1))
+            if first_season is not None and season < first_season:
+                continue
+            if last_season is not None and season > last_season:
+                continue
+            seasons.append(season)
+        return [self.match_partition(season) for season in sorted(seasons)]
+
+    def _next_match_id(self) -> int:
+        """
+        First free match id over every season table, ids stay unique across
+        seasons as with the shared sequence of the Postgres partitions.
+        """
+        last = 0
+        with self.engine.connect() as conn:
+            for table in self.match_tables():
+                last = max(
+                    last, conn.execute(select(func.max(table.c.id))).scalar() or 0
+                )
+        return last + 1
+
+    def write_players(self, df: pd.DataFrame):
+        """
+        Insert players from a DataFrame into the joueurs table,
+        avoiding duplicates on (name, ioc).
+        Existing players whose row_hash changed are updated.
+        """
+        if "gender" not in df.columns:
+            df = df.assign(gender=None)
+        df = df[["name", "hand", "ht", "ioc", "gender"]].drop_duplicates()
+        df = df.dropna(subset=["name", "ioc"])  # ignore invalid rows
+        df["ht"] = pd.to_numeric(df["ht"], errors="coerce").astype("Int64")
+
+        result = self._sync_rows(Joueur, df, ["name", "ioc"], PLAYER_HASH_COLS)
+        logger.info(
+            f"{result.inserted} joueurs insérés, {result.updated} mis à jour, "
+            f"{result.ignored} ignorés."
+        )
 
     def write_tourney(self, df: pd.DataFrame):
         """
         Insert tournaments from a DataFrame into the tournois table,
-        avoiding duplicates on tourney_id.
+        avoiding duplicates on (tourney_id, gender).
         Converts dates to proper datetime.date objects.
+        Existing tournaments whose row_hash changed are updated.
         """
         expected_cols = [
             "tourney_id",
@@ -143,6 +658,7 @@ class DbNeon:
             "tourney_level",
             "tourney_date",
             "tourney_start_date",
+            "gender",
         ]
         for col in expected_cols:
             if col not in df.columns:
@@ -155,139 +671,509 @@ class DbNeon:
         df["tourney_start_date"] = pd.to_datetime(
             df["tourney_start_date"], errors="coerce"
         ).dt.date
+        df["draw_size"] = pd.to_numeric(df["draw_size"], errors="coerce").astype(
+            "Int64"
+        )
 
-        inserted = 0
-        with self.session_scope() as session:
-            for _, row in df.iterrows():
-                if pd.isna(row["tourney_id"]) or pd.isna(row["tourney_name"]):
-                    continue  # ligne invalide
+        df = df[expected_cols].dropna(subset=["tourney_id", "tourney_name"])
+        result = self._sync_rows(
+            Tournoi, df, ["tourney_id", "gender"], TOURNEY_HASH_COLS
+        )
+        logger.info(
+            f"{result.inserted} tournois insérés, {result.updated} mis à jour, "
+            f"{result.ignored} ignorés."
+        )
 
-                exists = (
-                    session.query(Tournoi)
-                    .filter_by(tourney_id=row["tourney_id"])
-                    .first()
-                )
-                if not exists:
-                    tourney = Tournoi(
-                        tourney_id=row["tourney_id"],
-                        tourney_name=row["tourney_name"],
-                        surface=row["surface"],
-                        draw_size=int(row["draw_size"])
-                        if pd.notna(row["draw_size"])
-                        else None,
-                        tourney_level=row["tourney_level"],
-                        tourney_date=row["tourney_date"],
-                        tourney_start_date=row["tourney_start_date"],
+    def _read_table(
+        self,
+        model,
+        columns: Optional[Sequence[str]],
+        filters: list,
+        dtypes: dict,
+        chunksize: Optional[int],
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Run a projected/filtered SELECT on ``model`` and cast the result
+        to compact dtypes.
+
+        When ``chunksize`` is given, an iterator of DataFrames is returned and
+        rows are streamed from the database (server side cursor on Postgres).
+        """
+        table = model.__table__
+        if columns is None:
+            columns = [c.name for c in table.columns]
+        unknown = set(columns) - set(table.columns.keys())
+        if unknown:
+            raise ValueError(
+                f"Colonnes inconnues pour la table {table.name}: {unknown}"
+            )
+
+        stmt = select(*[table.c[col] for col in columns])
+        for clause in filters:
+            stmt = stmt.where(clause)
+        col_dtypes = {col: dtype for col, dtype in dtypes.items() if col in columns}
+        return self._read_select(stmt, col_dtypes, chunksize)
+
+    def _read_select(
+        self, stmt, col_dtypes: dict, chunksize: Optional[int]
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Run ``stmt`` (or a list of statements whose rows are concatenated in
+        order) and cast the result to compact dtypes.
+        """
+        stmts = stmt if isinstance(stmt, list) else [stmt]
+        if chunksize is None:
+            with self.engine.connect() as conn:
+                frames = [pd.read_sql(s, conn) for s in stmts]
+            df = pd.concat([f for f in frames if not f.empty] or frames[:1])
+            return _to_compact(df.reset_index(drop=True), col_dtypes)
+
+        return self._iter_chunks(stmts, col_dtypes, chunksize)
+
+    def _iter_chunks(self, stmts: list, col_dtypes: dict, chunksize: int):
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True)
+            for stmt in stmts:
+                for chunk in pd.read_sql(stmt, conn, chunksize=chunksize):
+                    yield _to_compact(chunk, col_dtypes)
+
+    def read_players(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        ids: Optional[Iterable[int]] = None,
+        names: Optional[Iterable[str]] = None,
+        genders: Optional[Iterable[str]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read players from the joueurs table into a DataFrame.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Columns to select, default is all columns.
+        ids : iterable of int, optional
+            Keep only these player ids.
+        names : iterable of str, optional
+            Keep only these player names.
+        genders : iterable of str, optional
+            Keep only these genders ("atp", "wta").
+        chunksize : int, optional
+            If given, return an iterator of DataFrames of at most
+            ``chunksize`` rows instead of a single DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame or iterator of pd.DataFrame
+        """
+        filters = []
+        if ids is not None:
+            filters.append(Joueur.id.in_([int(i) for i in ids]))
+        if names is not None:
+            filters.append(Joueur.name.in_(list(names)))
+        if genders is not None:
+            filters.append(Joueur.gender.in_(list(genders)))
+        return self._read_table(Joueur, columns, filters, PLAYER_DTYPES, chunksize)
+
+    def read_tourneys(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        ids: Optional[Iterable[int]] = None,
+        tourney_ids: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        genders: Optional[Iterable[str]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read tournaments from the tournois table into a DataFrame.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Columns to select, default is all columns.
+        ids : iterable of int, optional
+            Keep only these internal ids (``tournois.id``).
+        tourney_ids : iterable of str, optional
+            Keep only these source tournament ids (``tournois.tourney_id``).
+        names : iterable of str, optional
+            Keep only these tournament names.
+        start_date, end_date : date, optional
+            Inclusive bounds on ``tourney_date``.
+        genders : iterable of str, optional
+            Keep only these genders ("atp", "wta").
+        chunksize : int, optional
+            If given, return an iterator of DataFrames of at most
+            ``chunksize`` rows instead of a single DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame or iterator of pd.DataFrame
+        """
+        filters = []
+        if ids is not None:
+            filters.append(Tournoi.id.in_([int(i) for i in ids]))
+        if tourney_ids is not None:
+            filters.append(Tournoi.tourney_id.in_(list(tourney_ids)))
+        if names is not None:
+            filters.append(Tournoi.tourney_name.in_(list(names)))
+        if start_date is not None:
+            filters.append(Tournoi.tourney_date >= start_date)
+        if end_date is not None:
+            filters.append(Tournoi.tourney_date <= end_date)
+        if genders is not None:
+            filters.append(Tournoi.gender.in_(list(genders)))
+        return self._read_table(Tournoi, columns, filters, TOURNEY_DTYPES, chunksize)
+
+    def read_matches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        genders: Optional[Iterable[str]] = None,
+        player_ids: Optional[Iterable[int]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read matches joined with the date, surface and gender of their
+        tournament, ordered by date.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Columns to select among the matches columns and ``tourney_date``,
+            ``surface``, ``gender``. Default is all of them.
+        start_date, end_date : date, optional
+            Inclusive bounds on ``tourney_date``.
+        genders : iterable of str, optional
+            Keep only these genders ("atp", "wta").
+        player_ids : iterable of int, optional
+            Keep only the matches won or lost by these players.
+        chunksize : int, optional
+            If given, return an iterator of DataFrames of at most
+            ``chunksize`` rows instead of a single DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame or iterator of pd.DataFrame
+        """
+        available = [c.name for c in Match.__table__.columns]
+        available += MATCH_TOURNEY_COLS
+        if columns is None:
+            columns = available
+        unknown = set(columns) - set(available)
+        if unknown:
+            raise ValueError(f"Colonnes inconnues pour la table matches: {unknown}")
+
+        # the season of a match is the year of its tournament date
+        first_season = start_date.year if start_date is not None else None
+        last_season = end_date.year if end_date is not None else None
+        if player_ids is not None:
+            player_ids = [int(i) for i in player_ids]
+
+        stmts = []
+        for table in self.match_tables(first_season, last_season):
+            selected = [
+                Tournoi.__table__.c[col] if col in MATCH_TOURNEY_COLS else table.c[col]
+                for col in columns
+            ]
+            stmt = (
+                select(*selected)
+                .select_from(table)
+                .join(Tournoi, Tournoi.id == table.c.tourney_id, isouter=True)
+                .order_by(Tournoi.tourney_date, table.c.id)
+            )
+            if first_season is not None:
+                stmt = stmt.where(table.c.season >= first_season)
+                stmt = stmt.where(Tournoi.tourney_date >= start_date)
+            if last_season is not None:
+                stmt = stmt.where(table.c.season <= last_season)
+                stmt = stmt.where(Tournoi.tourney_date <= end_date)
+            if genders is not None:
+                stmt = stmt.where(Tournoi.gender.in_(list(genders)))
+            if player_ids is not None:
+                stmt = stmt.where(
+                    or_(
+                        table.c.winner_id.in_(player_ids),
+                        table.c.loser_id.in_(player_ids),
                     )
-                    session.add(tourney)
-                    inserted += 1
+                )
+            stmts.append(stmt)
 
-        logger.info(f"{inserted} tournois insérés, {len(df) - inserted} ignorés.")
+        col_dtypes = {
+            col: dtype for col, dtype in MATCH_DTYPES.items() if col in columns
+        }
+        if not stmts:  # no season table yet
+            empty = _to_compact(pd.DataFrame(columns=list(columns)), col_dtypes)
+            return empty if chunksize is None else iter([])
+        return self._read_select(stmts, col_dtypes, chunksize)
 
-    def read_players(self):
+    def write_live_scores(self, df: pd.DataFrame) -> int:
         """
-        Read all players from the joueurs table into a DataFrame.
+        Insert or update the state of live matches in the live_scores table,
+        rows are matched on event_id and only written when their row_hash
+        changed. Missing columns and values keep their stored value.
+
+        Returns
+        -------
+        int
+            Number of inserted or updated rows.
         """
-        with self.session_scope() as session:
-            query = session.query(Joueur)
-            df = pd.read_sql(query.statement, session.bind)
-        return df
+        for col in LIVE_HASH_COLS:
+            if col not in df.columns:
+                df[col] = None
+        df = df[["event_id"] + LIVE_HASH_COLS].dropna(subset=["event_id"])
+        df["event_id"] = df["event_id"].astype(str)
+
+        stmt = select(
+            LiveScore.event_id, *[LiveScore.__table__.c[c] for c in LIVE_HASH_COLS]
+        )
+        stmt = stmt.where(LiveScore.event_id.in_(df["event_id"].tolist()))
+        with self.engine.connect() as conn:
+            stored = pd.read_sql(stmt, conn).set_index("event_id")
+        stored = stored.reindex(df["event_id"])
+        for col in LIVE_HASH_COLS:
+            df[col] = df[col].where(df[col].notna(), stored[col].to_numpy())
+        for col in ["home_id", "away_id"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        df["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    def read_tourneys(self):
+        result = self._sync_rows(
+            LiveScore,
+            df,
+            ["event_id"],
+            LIVE_HASH_COLS,
+            filters=[LiveScore.event_id.in_(df["event_id"].tolist())],
+        )
+        logger.info(
+            f"{result.inserted} scores live insérés, {result.updated} mis à jour, "
+            f"{result.ignored} ignorés."
+        )
+        return result.inserted + result.updated
+
+    def _season_pairs(self, matches: pd.DataFrame) -> pd.DataFrame:
         """
-        Read all tournaments from the tournois table into a DataFrame.
-        :return: DataFrame containing all tournaments.
+        Distinct (joueur_id, season) pairs of the players of ``matches``.
         """
-        with self.session_scope() as session:
-            query = session.query(Tournoi)
-            df = pd.read_sql(query.statement, session.bind)
-        return df
+        tourneys = self.read_tourneys(
+            columns=["id", "tourney_date"], ids=matches["tourney_id"].unique()
+        )
+        tourneys = tourneys.rename(columns={"id": "tourney_id"})
+        df = matches.merge(tourneys, on="tourney_id", how="inner")
+        df["season"] = df["tourney_date"].dt.year
+        winners = df[["winner_id", "season"]].set_axis(["joueur_id", "season"], axis=1)
+        losers = df[["loser_id", "season"]].set_axis(["joueur_id", "season"], axis=1)
+        pairs = pd.concat([winners, losers]).dropna().astype(int)
+        return pairs.drop_duplicates().reset_index(drop=True)
 
-    def write_matches(self, df: pd.DataFrame):
+    def _compute_player_season_stats(
+        self, pairs: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
         """
-        Insert matches from a DataFrame into the matches table,
-        avoiding duplicates on (tourney_id, player1_id, player2_id).
-        build match id from tourney_id and player1_id and player2_id.
+        Aggregate the matches of the (joueur_id, season) ``pairs``,
+        of every player and season when ``pairs`` is None.
         """
-        expected_cols = [
-            "tourney_id",
-            "winner_id",
-            "winner_seed",
-            "winner_entry",
-            "winner_name",
-            "loser_id",
-            "loser_seed",
-            "loser_entry",
-            "loser_name",
-            "score",
-            "best_of",
-            "round",
-            "minutes",
-            "w_ace",
-            "w_df",
-            "w_svpt",
-            "w_1stIn",
-            "w_1stWon",
-            "w_2ndWon",
-            "w_SvGms",
-            "w_bpSaved",
-            "w_bpFaced",
-            "l_ace",
-            "l_df",
-            "l_svpt",
-            "l_1stIn",
-            "l_1stWon",
-            "l_2ndWon",
-            "l_SvGms",
-            "l_bpSaved",
-            "l_bpFaced",
-            "winner_rank",
-            "winner_rank_points",
-            "loser_rank",
-            "loser_rank_points",
-        ]
-        for col in expected_cols:
+        columns = ["winner_id", "loser_id", "score", "tourney_date", "surface"]
+        columns += SERVE_STAT_COLS
+        if pairs is None:
+            df = self.read_matches(columns=columns)
+        else:
+            df = self.read_matches(
+                columns=columns,
+                start_date=date(int(pairs["season"].min()), 1, 1),
+                end_date=date(int(pairs["season"].max()), 12, 31),
+                player_ids=pairs["joueur_id"].unique(),
+            )
+        df = df.dropna(subset=["tourney_date"])
+        df["season"] = df["tourney_date"].dt.year
+        df["surface"] = df["surface"].fillna(0)
+
+        stats = player_season_aggregates(df)
+        if pairs is not None:
+            stats = stats.merge(pairs, on=["joueur_id", "season"])
+        return stats
+
+    def refresh_player_season_stats(
+        self, matches: Optional[pd.DataFrame] = None, batch_size: int = 500
+    ):
+        """
+        Refresh the player_season_stats table.
+
+        Only the (player, season) pairs of ``matches`` are recomputed, from
+        the matches of these players in these seasons; without ``matches``
+        the whole table is rebuilt.
+
+        Parameters
+        ----------
+        matches : pd.DataFrame, optional
+            Keys (tourney_id, winner_id, loser_id) of the inserted or updated
+            matches, as returned by ``write_matches``.
+        batch_size : int
+            Number of players recomputed at once.
+        """
+        if matches is None:
+            stats = self._compute_player_season_stats()
+            with self.session_scope() as session:
+                session.execute(delete(PlayerSeasonStats))
+                session.bulk_insert_mappings(PlayerSeasonStats, _to_records(stats))
+            logger.info(f"{len(stats)} agrégats joueur/saison reconstruits.")
+            return
+
+        pairs = self._season_pairs(matches)
+        players = pairs["joueur_id"].unique()
+        written = 0
+        for start in range(0, len(players), batch_size):
+            batch = pairs[pairs["joueur_id"].isin(players[start : start + batch_size])]
+            stats = self._compute_player_season_stats(batch)
+            keys = list(batch.itertuples(index=False, name=None))
+            with self.session_scope() as session:
+                session.execute(
+                    delete(PlayerSeasonStats).where(
+                        tuple_(
+                            PlayerSeasonStats.joueur_id, PlayerSeasonStats.season
+                        ).in_(keys)
+                    )
+                )
+                session.bulk_insert_mappings(PlayerSeasonStats, _to_records(stats))
+            written += len(stats)
+
+        logger.info(f"{written} agrégats joueur/saison recalculés.")
+
+    def read_player_season_stats(
+        self,
+        player_ids: Optional[Iterable[int]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        surfaces: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read pre-aggregated player results.
+
+        Parameters
+        ----------
+        player_ids : iterable of int, optional
+            Keep only these players.
+        seasons : iterable of int, optional
+            Keep only these seasons.
+        surfaces : iterable of str, optional
+            Keep only these surfaces ("Hard", "Clay"...).
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        filters = []
+        if player_ids is not None:
+            filters.append(
+                PlayerSeasonStats.joueur_id.in_([int(i) for i in player_ids])
+            )
+        if seasons is not None:
+            filters.append(PlayerSeasonStats.season.in_([int(s) for s in seasons]))
+        if surfaces is not None:
+            codes = [SURFACE_CODES.get(surface, 0) for surface in surfaces]
+            filters.append(PlayerSeasonStats.surface.in_(codes))
+        return self._read_table(
+            PlayerSeasonStats, None, filters, PLAYER_SEASON_DTYPES, None
+        )
+
+    def write_player_aliases(self, df: pd.DataFrame):
+        """
+        Insert player aliases from a DataFrame into the joueurs_alias table,
+        avoiding duplicates on (alias, ioc).
+        expected_cols = ["alias", "ioc", "joueur_id", "score", "source"]
+        """
+        for col in ["ioc", "score", "source"]:
             if col not in df.columns:
                 df[col] = None
+        df = df.drop_duplicates(subset=["alias", "ioc"])
 
         inserted = 0
         with self.session_scope() as session:
             for _, row in df.iterrows():
-                if (
-                    pd.isna(row["tourney_id"])
-                    or pd.isna(row["winner_id"])
-                    or pd.isna(row["loser_id"])
-                ):
+                if pd.isna(row["alias"]) or pd.isna(row["joueur_id"]):
                     continue
-                # Check if match already exists
+                ioc = row["ioc"] if pd.notna(row["ioc"]) else ""
                 exists = (
-                    session.query(Match)
-                    .filter_by(
-                        tourney_id=row["tourney_id"],
-                        winner_id=row["winner_id"],
-                        loser_id=row["loser_id"],
-                    )
+                    session.query(JoueurAlias)
+                    .filter_by(alias=row["alias"], ioc=ioc)
                     .first()
                 )
                 if not exists:
-                    match = Match(
-                        tourney_id=row["tourney_id"],
-                        winner_id=row["winner_id"],
-                        loser_id=row["loser_id"],
-                        winner_entry=row["winner_entry"]
-                        if pd.notna(row["winner_entry"])
-                        else None,
-                        loser_entry=row["loser_entry"]
-                        if pd.notna(row["loser_entry"])
-                        else None,
-                        winner_name=row["winner_name"]
-                        if pd.notna(row["winner_name"])
-                        else None,
-                        loser_name=row["loser_name"]
-                        if pd.notna(row["loser_name"])
-                        else None,
-                        score=row["score"] if pd.notna(row["score"]) else None,
+                    alias = JoueurAlias(
+                        alias=row["alias"],
+                        ioc=ioc,
+                        joueur_id=int(row["joueur_id"]),
+                        score=float(row["score"]) if pd.notna(row["score"]) else None,
+                        source=row["source"] if pd.notna(row["source"]) else None,
                     )
-                    session.add(match)
+                    session.add(alias)
                     inserted += 1
-        logger.info(f"{inserted} matches insérés, {len(df) - inserted} ignorés.")
+
+        logger.info(f"{inserted} alias insérés, {len(df) - inserted} ignorés.")
+
+    def read_player_aliases(
+        self, chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read all player aliases from the joueurs_alias table into a DataFrame.
+        """
+        return self._read_table(JoueurAlias, None, [], ALIAS_DTYPES, chunksize)
+
+    def write_matches(self, df: pd.DataFrame):
+        """
+        Insert matches from a DataFrame into the matches table,
+        avoiding duplicates on (tourney_id, winner_id, loser_id).
+        Existing matches whose row_hash changed (score fix...) are updated.
+        ``tourney_id`` is the id of the tournois table, ``round`` and
+        ``surface`` are the source strings, encoded with ROUND_CODES and
+        SURFACE_CODES. Rows are routed to the partition of their season.
+
+        Returns
+        -------
+        pd.DataFrame
+            Keys (tourney_id, winner_id, loser_id) of the inserted or
+            updated matches.
+        """
+        expected_cols = ["tourney_id", "winner_id", "loser_id"] + MATCH_HASH_COLS
+        for col in expected_cols:
+            if col not in df.columns:
+                df[col] = None
+
+        df = df.dropna(subset=["tourney_id", "winner_id", "loser_id"])
+        df = df[expected_cols].copy()
+        for col in ["tourney_id", "winner_id", "loser_id"]:
+            df[col] = df[col].astype("int64")
+        df["round"] = df["round"].map(ROUND_CODES).fillna(0).astype("int64")
+        df["surface"] = df["surface"].map(SURFACE_CODES).fillna(0).astype("int64")
+        for col in MATCH_STAT_COLS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+
+        tourneys = self.read_tourneys(
+            columns=["id", "tourney_date"], ids=df["tourney_id"].unique()
+        )
+        seasons = tourneys.set_index("id")["tourney_date"].dt.year
+        df["season"] = df["tourney_id"].map(seasons).fillna(0).astype("int64")
+
+        key_cols = ["tourney_id", "winner_id", "loser_id"]
+        inserted = updated = ignored = 0
+        changed = [pd.DataFrame(columns=key_cols)]
+        # each season is synced against its own partition only
+        for season, rows in df.groupby("season"):
+            table = self.match_partition(season)
+            result = self._sync_rows(
+                table,
+                rows,
+                key_cols,
+                MATCH_HASH_COLS,
+                filters=[table.c.season == int(season)],
+                assign_ids=self.season_tables,
+            )
+            inserted += result.inserted
+            updated += result.updated
+            ignored += result.ignored
+            changed.append(result.changed)
+
+        logger.info(
+            f"{inserted} matches insérés, {updated} mis à jour, {ignored} ignorés."
+        )
+        return pd.concat(changed, ignore_index=True)
@@ -0,0 +1,276 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+# Particles ignored when building the blocking index ("Juan Martin del Potro").
+PARTICLES = {
+    "de",
+    "del",
+    "della",
+    "der",
+    "di",
+    "da",
+    "dos",
+    "du",
+    "la",
+    "le",
+    "van",
+    "von",
+}
+
+# Two candidates closer than this are a tie, only broken by the ioc.
+TIE_MARGIN = 0.02
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a player name to compare names from different sources.
+
+    Accents are removed, the name is lower cased and hyphens, dots and
+    apostrophes are replaced by spaces.
+
+    Examples
+    --------
+    >>> normalize_name("Jo-Wilfried  Tsonga")
+    'jo wilfried tsonga'
+    >>> normalize_name("Stan Wawrinka")
+    'stan wawrinka'
+    """
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[-.'’`,]", " ", name.lower())
+    return " ".join(name.split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _token_score(tokens: List[str], cand_tokens: List[str]) -> float:
+    """
+    Order insensitive token alignment, single letters are matched as
+    initials ("R Nadal" / "Nadal R" vs "Rafael Nadal").
+    """
+    remaining = list(cand_tokens)
+    total = 0.0
+    for token in sorted(tokens, key=len, reverse=True):
+        best, best_idx = 0.0, None
+        for idx, cand in enumerate(remaining):
+            if len(token) == 1:
+                sim = 0.9 if cand[0] == token else 0.0
+            elif token == cand:
+                sim = 1.0
+            else:
+                sim = _dice(_trigrams(token), _trigrams(cand))
+            if sim > best:
+                best, best_idx = sim, idx
+        if best_idx is not None:
+            remaining.pop(best_idx)
+        total += best
+    return total / max(len(tokens), len(cand_tokens))
+
+
+class PlayerResolver:
+    """
+    Resolve player names coming from other sources to ``Joueur.id``.
+
+    Candidates are found through a blocking index on name tokens (surname,
+    first names), then scored with token and character trigram similarity;
+    the ioc only breaks ties, as players can change nationality. A name
+    matching two players equally well is left unresolved. Every resolved
+    name is cached as an alias so repeated lookups are a dict access;
+    aliases can be persisted in the joueurs_alias table with
+    :meth:`save_aliases`.
+    """
+
+    def __init__(
+        self,
+        players: pd.DataFrame,
+        aliases: Optional[pd.DataFrame] = None,
+        threshold: float = 0.8,
+    ):
+        """
+        :param players: DataFrame with at least ``id``, ``name`` and ``ioc`` columns
+        :param aliases: DataFrame with ``alias``, ``ioc``, ``joueur_id`` and ``score``
+        :param threshold: minimum score to accept a match
+        """
+        self.threshold = threshold
+        self._ids: List[int] = []
+        self._iocs: List[str] = []
+        self._tokens: List[List[str]] = []
+        self._grams: List[Set[str]] = []
+        self._blocks: Dict[str, List[int]] = defaultdict(list)
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[Optional[int], float]] = {}
+        self._new_aliases: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+        for pid, name, ioc in players[["id", "name", "ioc"]].itertuples(index=False):
+            self._add_player(int(pid), name, ioc if isinstance(ioc, str) else "")
+
+        if aliases is not None:
+            for alias, ioc, pid, score in aliases[
+                ["alias", "ioc", "joueur_id", "score"]
+            ].itertuples(index=False):
+                ioc = ioc if isinstance(ioc, str) else ""
+                self._cache[(alias, ioc)] = (
+                    int(pid),
+                    float(score) if pd.notna(score) else 1.0,
+                )
+
+    @classmethod
+    def from_db(cls, db, genders: Optional[Iterable[str]] = None, **kwargs):
+        """
+        Build a resolver from the joueurs and joueurs_alias tables.
+        """
+        players = db.read_players(columns=["id", "name", "ioc"], genders=genders)
+        return cls(players, aliases=db.read_player_aliases(), **kwargs)
+
+    def _add_player(self, pid: int, name: str, ioc: str):
+        norm = normalize_name(name)
+        if not norm:
+            return
+        idx = len(self._ids)
+        tokens = norm.split()
+        self._ids.append(pid)
+        self._iocs.append(ioc)
+        self._tokens.append(tokens)
+        self._grams.append(_trigrams(norm))
+        for token in set(tokens):
+            if len(token) > 1 and token not in PARTICLES:
+                self._blocks[token].append(idx)
+        self._exact.setdefault((norm, ioc), pid)
+        self._exact.setdefault((norm, ""), pid)
+
+    def _candidates(self, tokens: List[str]) -> Set[int]:
+        candidates = set()
+        for token in tokens:
+            if len(token) > 1 and token not in PARTICLES:
+                candidates.update(self._blocks.get(token, ()))
+        return candidates
+
+    def resolve(
+        self, name: str, ioc: Optional[str] = None
+    ) -> Tuple[Optional[int], float]:
+        """
+        Resolve one name to a player id.
+
+        Parameters
+        ----------
+        name : str
+            Player name as spelled by the source.
+        ioc : str, optional
+            Country code of the player, used to break ties.
+
+        Returns
+        -------
+        tuple
+            ``(joueur_id, score)``, ``joueur_id`` is None when no candidate
+            reaches the threshold.
+        """
+        norm = normalize_name(name)
+        ioc = ioc if isinstance(ioc, str) else ""
+        key = (norm, ioc)
+        if key in self._cache:
+            return self._cache[key]
+
+        pid = self._exact.get(key, self._exact.get((norm, "")))
+        if pid is not None:
+            result = (pid, 1.0)
+        else:
+            result = self._fuzzy(norm, ioc)
+            if result[0] is not None:
+                self._new_aliases[key] = result
+        self._cache[key] = result
+        return result
+
+    def _fuzzy(self, norm: str, ioc: str) -> Tuple[Optional[int], float]:
+        tokens = norm.split()
+        grams = _trigrams(norm)
+        scored = []
+        for idx in self._candidates(tokens):
+            score = max(
+                _token_score(tokens, self._tokens[idx]),
+                _dice(grams, self._grams[idx]),
+            )
+            scored.append((score, idx))
+        if not scored:
+            return None, 0.0
+
+        best_score = max(score for score, _ in scored)
+        if best_score < self.threshold:
+            return None, best_score
+        tied = {
+            self._ids[idx]: (score, idx)
+            for score, idx in scored
+            if score >= best_score - TIE_MARGIN
+        }
+        if len(tied) > 1 and ioc:
+            tied = {pid: t for pid, t in tied.items() if self._iocs[t[1]] == ioc}
+        if len(tied) != 1:
+            # ambiguous name ("Smith J."), better unresolved than a wrong alias
+            return None, best_score
+        pid, (score, _) = next(iter(tied.items()))
+        return pid, score
+
+    def resolve_many(
+        self, names: Iterable[str], iocs: Optional[Iterable[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Resolve many names at once.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with ``name``, ``ioc``, ``joueur_id`` and ``score`` columns,
+            in the input order.
+        """
+        names = list(names)
+        iocs = list(iocs) if iocs is not None else [None] * len(names)
+        results = [self.resolve(name, ioc) for name, ioc in zip(names, iocs)]
+        return pd.DataFrame(
+            {
+                "name": names,
+                "ioc": iocs,
+                "joueur_id": pd.array([r[0] for r in results], dtype="Int32"),
+                "score": pd.array([r[1] for r in results], dtype="float32"),
+            }
+        )
+
+    def new_aliases(self, source: Optional[str] = None) -> pd.DataFrame:
+        """
+        Aliases learned by fuzzy matching since the resolver was built.
+        """
+        return pd.DataFrame(
+            [
+                {
+                    "alias": alias,
+                    "ioc": ioc,
+                    "joueur_id": pid,
+                    "score": score,
+                    "source": source,
+                }
+                for (alias, ioc), (pid, score) in self._new_aliases.items()
+            ],
+            columns=["alias", "ioc", "joueur_id", "score", "source"],
+        )
+
+    def save_aliases(self, db, source: Optional[str] = None):
+        """
+        Persist the learned aliases in the joueurs_alias table.
+        """
+        df = self.new_aliases(source)
+        if not df.empty:
+            db.write_player_aliases(df)
+        self._new_aliases.clear()
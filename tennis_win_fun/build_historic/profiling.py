@@ -0,0 +1,187 @@
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Frames under this share of the stage time are left out of collapsed stacks.
+MIN_SHARE = 1e-5
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":  # built-in functions
+        return name.replace(";", ":")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, float]:
+    """
+    Rebuild approximate call stacks from a cProfile result.
+
+    cProfile only records caller -> callee edges, so the time of a function is
+    split between its callers in proportion of the time spent under each of
+    them, as flame graph tools for pstats do.
+
+    Returns
+    -------
+    dict
+        ``"root;caller;function"`` -> own time in seconds.
+    """
+    entries = stats.stats
+    callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_ct))
+
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    total = sum(entries[func][3] for func in roots) or 1.0
+    stacks: Dict[str, float] = {}
+
+    def walk(func, path: List[str], on_path: set, share: float):
+        _, _, tottime, cumtime, _ = entries[func]
+        label = ";".join(path)
+        own = tottime * share
+        if own > 0:
+            stacks[label] = stacks.get(label, 0.0) + own
+        for callee, edge_ct in callees.get(func, []):
+            callee_ct = entries[callee][3]
+            if callee in on_path or callee_ct <= 0:
+                continue
+            callee_share = share * edge_ct / callee_ct
+            if callee_ct * callee_share < total * MIN_SHARE:
+                continue
+            on_path.add(callee)
+            walk(callee, path + [_label(callee)], on_path, callee_share)
+            on_path.discard(callee)
+
+    for root in roots:
+        walk(root, [_label(root)], {root}, 1.0)
+    return stacks
+
+
+class StageProfiler:
+    """
+    Profile named stages of a batch with cProfile (and optionally tracemalloc).
+
+    For each stage a ``<n>_<stage>.pstats`` file (for snakeviz, pstats...) and
+    a ``<n>_<stage>.collapsed`` file (one ``a;b;c microseconds`` line per
+    stack, input of flamegraph.pl / speedscope) are written in
+    ``output_dir``; :meth:`report` writes a hotspot summary.
+    """
+
+    def __init__(self, output_dir: str, trace_memory: bool = False, top_n: int = 15):
+        """
+        :param output_dir: directory of the profiling files, created if needed
+        :param trace_memory: also measure the memory peak of each stage
+        :param top_n: number of functions listed per stage in the summary
+        """
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self.stages: List[dict] = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile the code run inside the ``with`` block as stage ``name``.
+        """
+        prefix = os.path.join(self.output_dir, f"{len(self.stages) + 1:02d}_{name}")
+        profile = cProfile.Profile()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall = time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            profile.dump_stats(f"{prefix}.pstats")
+            stats = pstats.Stats(profile)
+            with open(f"{prefix}.collapsed", "w", encoding="utf-8") as f:
+                for stack, seconds in sorted(collapsed_stacks(stats).items()):
+                    f.write(f"{stack} {int(seconds * 1e6)}\n")
+
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("tottime").print_stats(
+                self.top_n
+            )
+            self.stages.append(
+                {"name": name, "wall": wall, "peak": peak, "top": out.getvalue()}
+            )
+
+    def report(self) -> str:
+        """
+        Write and return the summary: time and memory peak of each stage,
+        slowest first, then the top functions by own time of each stage.
+        """
+        lines = ["Étapes (les plus lentes d'abord) :"]
+        for stage in sorted(self.stages, key=lambda s: s["wall"], reverse=True):
+            peak = ""
+            if stage["peak"] is not None:
+                peak = f"  pic mémoire {stage['peak'] / 2**20:.1f} Mo"
+            lines.append(f"  {stage['name']:<30} {stage['wall']:8.2f} s{peak}")
+        for stage in self.stages:
+            lines += ["", f"=== {stage['name']} ===", stage["top"].strip()]
+
+        summary = "\n".join(lines)
+        with open(
+            os.path.join(self.output_dir, "summary.txt"), "w", encoding="utf-8"
+        ) as f:
+            f.write(summary + "\n")
+        print(summary)
+        return summary
+
+
+class NoProfiler:
+    """
+    Stand-in used when profiling is disabled.
+    """
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def report(self) -> Optional[str]:
+        return None
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the ``--profile``, ``--tracemalloc`` and ``--top`` options of the
+    batch entry points.
+    """
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="profile each stage and write .pstats/.collapsed files in DIR",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="with --profile, also measure the memory peak of each stage",
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="functions listed per stage"
+    )
+
+
+def profiler_from_args(args: argparse.Namespace):
+    """
+    StageProfiler configured from the command line, NoProfiler without
+    ``--profile``.
+    """
+    if not args.profile:
+        return NoProfiler()
+    return StageProfiler(args.profile, trace_memory=args.tracemalloc, top_n=args.top)
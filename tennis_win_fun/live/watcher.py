@@ -0,0 +1,313 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pandas as pd
+import requests
+
+from tennis_win_fun.build_historic.models import LIVE_HASH_COLS
+
+logger = logging.getLogger(__name__)
+
+RAPIDAPI_HOST = "tennis-api-atp-wta-itf.p.rapidapi.com"
+
+Parser = Callable[[Any], List[Dict]]
+
+# Statuses (lower case) of a match that is over, it is no longer polled.
+FINISHED_STATUSES = {
+    "finished",
+    "ended",
+    "ft",
+    "retired",
+    "walkover",
+    "cancelled",
+    "canceled",
+}
+
+
+def default_parser(payload: Any) -> List[Dict]:
+    """
+    Accept a list of records or a ``{"data": [...]}`` envelope.
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("data", [])
+    return list(payload or [])
+
+
+@dataclass
+class EndpointSchedule:
+    """
+    An endpoint polled every ``interval`` seconds.
+
+    ``parser`` turns the JSON payload into records holding an ``event_id`` and
+    some of the live_scores columns. With ``per_event=True`` the ``path`` is a
+    template (``"/odds/{event_id}"``) polled for every known live match.
+    """
+
+    name: str
+    path: str
+    interval: float
+    parser: Parser = default_parser
+    per_event: bool = False
+
+
+class RapidApiSource:
+    """
+    Fetch JSON payloads from the RapidAPI tennis API.
+
+    ``requests`` is blocking, calls run in the default thread pool so the
+    endpoints are still polled concurrently.
+    """
+
+    def __init__(self, api_key: str, host: str = RAPIDAPI_HOST, timeout: float = 10):
+        self.host = host
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"x-rapidapi-key": api_key, "x-rapidapi-host": host}
+        )
+
+    def _get(self, path: str) -> Any:
+        response = self.session.get(f"https://{self.host}{path}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch(self, path: str) -> Any:
+        return await asyncio.to_thread(self._get, path)
+
+
+class StubSource:
+    """
+    Local stand-in for the API: ``payloads`` maps a path to a payload, or to a
+    list of payloads returned one per call (the last one is then repeated).
+    """
+
+    def __init__(self, payloads: Dict[str, Any]):
+        self.payloads = payloads
+        self.calls: Dict[str, int] = {}
+
+    async def fetch(self, path: str) -> Any:
+        count = self.calls.get(path, 0)
+        self.calls[path] = count + 1
+        payload = self.payloads.get(path, [])
+        if isinstance(payload, list) and payload and isinstance(payload[0], list):
+            return payload[min(count, len(payload) - 1)]
+        return payload
+
+
+@dataclass
+class LiveState:
+    """
+    In memory state of the live matches and the events changed since the
+    last write.
+
+    ``listed_by`` keeps the schedules whose last response listed each event:
+    an event no schedule lists anymore, or whose status is finished, is
+    ``finished``; it is no longer polled and is dropped once written.
+    """
+
+    rows: Dict[str, Dict] = field(default_factory=dict)
+    dirty: Set[str] = field(default_factory=set)
+    listed_by: Dict[str, Set[str]] = field(default_factory=dict)
+    finished: Set[str] = field(default_factory=set)
+
+    def apply(self, records: List[Dict], source: Optional[str] = None) -> int:
+        """
+        Merge records in the state, return the number of changed events.
+
+        ``source`` is the name of the schedule listing the events, None for
+        the ``per_event`` schedules.
+        """
+        changed = 0
+        for record in records:
+            if record.get("event_id") is None:
+                continue
+            event_id = str(record["event_id"])
+            current = self.rows.get(event_id, {})
+            update = {
+                col: value
+                for col, value in record.items()
+                if col in LIVE_HASH_COLS and current.get(col) != value
+            }
+            if update or event_id not in self.rows:
+                self.rows[event_id] = {**current, **update, "event_id": event_id}
+                self.dirty.add(event_id)
+                changed += 1
+
+            if source is not None:
+                self.listed_by.setdefault(event_id, set()).add(source)
+                self.finished.discard(event_id)
+            status = str(self.rows[event_id].get("status") or "").lower()
+            if status in FINISHED_STATUSES:
+                self.finished.add(event_id)
+        return changed
+
+    def retire(self, source: str, seen: Set[str]):
+        """
+        Mark as finished the events listed by ``source`` that are missing
+        from its last response ``seen``, and listed by no other schedule.
+        """
+        for event_id, sources in self.listed_by.items():
+            if source in sources and event_id not in seen:
+                sources.discard(source)
+                if not sources:
+                    self.finished.add(event_id)
+
+    def live_events(self) -> List[str]:
+        return [event_id for event_id in self.rows if event_id not in self.finished]
+
+    def pop_dirty(self) -> List[Dict]:
+        rows = [self.rows[event_id] for event_id in self.dirty]
+        self.dirty.clear()
+        return rows
+
+    def restore(self, rows: List[Dict]):
+        """
+        Mark rows popped by :meth:`pop_dirty` as dirty again (failed write).
+        """
+        self.dirty.update(row["event_id"] for row in rows)
+
+    def prune(self):
+        """
+        Forget the finished events whose last state is written.
+        """
+        for event_id in list(self.finished - self.dirty):
+            self.rows.pop(event_id, None)
+            self.listed_by.pop(event_id, None)
+            self.finished.discard(event_id)
+
+
+class LiveWatcher:
+    """
+    Poll live endpoints concurrently and persist only what changed.
+
+    Every schedule runs in its own task; responses are diffed against the
+    state kept in memory and the changed matches are written through
+    ``DbNeon.write_live_scores`` every ``flush_interval`` seconds, in one
+    batch.
+    """
+
+    def __init__(
+        self,
+        db,
+        source,
+        schedules: List[EndpointSchedule],
+        resolver=None,
+        flush_interval: float = 2.0,
+        max_concurrency: int = 20,
+    ):
+        """
+        :param db: DbNeon instance
+        :param source: RapidApiSource or StubSource
+        :param schedules: endpoints to poll
+        :param resolver: optional PlayerResolver to fill home_id/away_id
+        :param flush_interval: seconds between two writes to the database
+        :param max_concurrency: maximum number of requests in flight
+        """
+        self.db = db
+        self.source = source
+        self.schedules = schedules
+        self.resolver = resolver
+        self.flush_interval = flush_interval
+        self.state = LiveState()
+        self.n_writes = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _fetch(self, path: str) -> Any:
+        async with self._semaphore:
+            return await self.source.fetch(path)
+
+    async def poll_once(self, schedule: EndpointSchedule) -> int:
+        """
+        Poll an endpoint once (every live match for ``per_event`` endpoints)
+        and merge the records in the state.
+        """
+        if schedule.per_event:
+            event_ids = self.state.live_events()
+            paths = [schedule.path.format(event_id=e) for e in event_ids]
+        else:
+            event_ids, paths = [None], [schedule.path]
+
+        payloads = await asyncio.gather(
+            *[self._fetch(path) for path in paths], return_exceptions=True
+        )
+        changed = 0
+        for event_id, payload in zip(event_ids, payloads):
+            if isinstance(payload, Exception):
+                logger.warning(f"[LIVE] Échec de {schedule.name}: {payload!r}")
+                continue
+            try:
+                records = schedule.parser(payload)
+            except Exception as exc:
+                logger.warning(f"[LIVE] Réponse illisible de {schedule.name}: {exc!r}")
+                continue
+            if event_id is not None:
+                if event_id not in self.state.rows:
+                    # the event was dropped while its request was running
+                    continue
+                records = [{"event_id": event_id, **r} for r in records]
+                changed += self.state.apply(records)
+            else:
+                changed += self.state.apply(records, source=schedule.name)
+                seen = {
+                    str(r["event_id"]) for r in records if r.get("event_id") is not None
+                }
+                self.state.retire(schedule.name, seen)
+        return changed
+
+    async def _poll_forever(self, schedule: EndpointSchedule):
+        while True:
+            await self.poll_once(schedule)
+            await asyncio.sleep(schedule.interval)
+
+    def _resolve_players(self, df: pd.DataFrame) -> pd.DataFrame:
+        for side in ["home", "away"]:
+            if f"{side}_name" in df.columns:
+                resolved = self.resolver.resolve_many(df[f"{side}_name"])
+                df[f"{side}_id"] = resolved["joueur_id"].to_numpy()
+        return df
+
+    async def flush(self) -> int:
+        """
+        Write the changed matches to the database, then forget the finished
+        matches. On failure the changes are kept for the next flush.
+        """
+        rows = self.state.pop_dirty()
+        written = 0
+        if rows:
+            try:
+                df = pd.DataFrame(rows)
+                if self.resolver is not None:
+                    df = self._resolve_players(df)
+                written = await asyncio.to_thread(self.db.write_live_scores, df)
+            except Exception:
+                # keep the changes for the next flush
+                self.state.restore(rows)
+                logger.exception(f"[LIVE] Échec de l'écriture de {len(rows)} matchs")
+                return 0
+        self.n_writes += written
+        self.state.prune()
+        return written
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def run(self, duration: Optional[float] = None):
+        """
+        Poll every schedule until cancelled, or for ``duration`` seconds.
+        """
+        tasks = [asyncio.create_task(self._poll_forever(s)) for s in self.schedules]
+        tasks.append(asyncio.create_task(self._flush_forever()))
+        try:
+            if duration is None:
+                await asyncio.gather(*tasks)
+            else:
+                await asyncio.sleep(duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.flush()
@@ -0,0 +1,135 @@
+from typing import Callable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Names of the rounds as in the "round" column of the historic data,
+# from the final backward.
+ROUND_NAMES = ["F", "SF", "QF", "R16", "R32", "R64", "R128"]
+
+WinProba = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def elo_win_proba(ratings: Mapping[int, float], default: float = 1500.0) -> WinProba:
+    """
+    Build a pairwise win probability function from Elo ratings.
+
+    Parameters
+    ----------
+    ratings : mapping
+        ``Joueur.id`` -> Elo rating.
+    default : float
+        Rating of the players missing from ``ratings``.
+
+    Returns
+    -------
+    callable
+        ``f(a_ids, b_ids)`` returning the probability that each player of
+        ``a_ids`` beats the player of ``b_ids`` at the same position.
+    """
+
+    def win_proba(a_ids: np.ndarray, b_ids: np.ndarray) -> np.ndarray:
+        lookup = np.vectorize(lambda pid: ratings.get(pid, default), otypes=[float])
+        diff = lookup(b_ids) - lookup(a_ids)
+        return 1.0 / (1.0 + 10.0 ** (diff / 400.0))
+
+    return win_proba
+
+
+class DrawSimulator:
+    """
+    Monte Carlo pricer of a tournament draw.
+
+    The pairwise win probabilities of all the players of the draw are computed
+    once, then every simulation of the bracket is played round by round on a
+    ``(n_sims, n_slots)`` array, so a whole round of every simulation is a
+    single vectorized operation.
+    """
+
+    def __init__(
+        self,
+        draw: Sequence[Optional[int]],
+        win_proba: WinProba,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param draw: ``Joueur.id`` in bracket order, None for a bye.
+            The length must be a power of two (``tournois.draw_size`` rounded up).
+        :param win_proba: function ``f(a_ids, b_ids)`` -> P(a beats b), vectorized
+        :param seed: seed of the random generator
+        """
+        n_slots = len(draw)
+        if n_slots < 2 or n_slots & (n_slots - 1):
+            raise ValueError(
+                f"La taille du tableau doit être une puissance de 2, reçu {n_slots}."
+            )
+        self.n_rounds = n_slots.bit_length() - 1
+        if self.n_rounds > len(ROUND_NAMES):
+            raise ValueError(f"Tableau trop grand: {n_slots} places.")
+
+        self.player_ids = np.array([pid for pid in draw if pid is not None])
+        if len(set(self.player_ids.tolist())) != len(self.player_ids):
+            raise ValueError("Un joueur apparaît plusieurs fois dans le tableau.")
+
+        # slot -> player index, byes point to an extra index
+        bye = len(self.player_ids)
+        index_of = {pid: i for i, pid in enumerate(self.player_ids.tolist())}
+        self.slots = np.array(
+            [bye if pid is None else index_of[pid] for pid in draw], dtype=np.int16
+        )
+
+        n = len(self.player_ids)
+        proba = np.ones((n + 1, n + 1), dtype=np.float32)
+        if n:
+            a, b = np.meshgrid(self.player_ids, self.player_ids, indexing="ij")
+            proba[:n, :n] = np.asarray(win_proba(a.ravel(), b.ravel())).reshape(n, n)
+        proba[n, :] = 0.0  # a bye never wins...
+        proba[n, n] = 1.0  # ...unless it meets another bye
+        self.proba = proba
+
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def round_names(self):
+        """
+        Columns of the result: rounds from the first one to the winner ("W").
+        """
+        return ROUND_NAMES[: self.n_rounds][::-1] + ["W"]
+
+    def run(self, n_sims: int = 100_000, chunk_size: int = 20_000) -> pd.DataFrame:
+        """
+        Simulate the draw ``n_sims`` times.
+
+        Parameters
+        ----------
+        n_sims : int
+            Number of simulations.
+        chunk_size : int
+            Simulations played at once, bounds the memory used.
+
+        Returns
+        -------
+        pd.DataFrame
+            Probability of reaching each round, indexed by ``Joueur.id``,
+            one column per round ("R128" ... "F", "W").
+        """
+        n = len(self.player_ids)
+        counts = np.zeros((self.n_rounds + 1, n + 1), dtype=np.int64)
+
+        done = 0
+        while done < n_sims:
+            size = min(chunk_size, n_sims - done)
+            alive = np.broadcast_to(self.slots, (size, len(self.slots)))
+            counts[0] += np.bincount(alive.ravel(), minlength=n + 1)
+            for rnd in range(1, self.n_rounds + 1):
+                a, b = alive[:, 0::2], alive[:, 1::2]
+                a_wins = self.rng.random(a.shape, dtype=np.float32) < self.proba[a, b]
+                alive = np.where(a_wins, a, b)
+                counts[rnd] += np.bincount(alive.ravel(), minlength=n + 1)
+            done += size
+
+        return pd.DataFrame(
+            counts[:, :n].T / n_sims,
+            index=pd.Index(self.player_ids, name="joueur_id"),
+            columns=self.round_names,
+        )
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from tennis_win_fun.build_historic.aggregates import (
+    parse_scores,
+    player_season_aggregates,
+)
+
+
+def test_parse_scores():
+    scores = pd.Series(["7-6(5) 6-4", "6-1 RET", "W/O", "4-6 6-3 [10-8]", None])
+    counts = parse_scores(scores)
+    assert counts.loc[0].to_dict() == {
+        "w_sets": 2,
+        "l_sets": 0,
+        "w_games": 13,
+        "l_games": 10,
+        "w_tiebreaks": 1,
+        "l_tiebreaks": 0,
+    }
+    assert counts.loc[1, ["w_sets", "w_games", "l_games"]].tolist() == [1, 6, 1]
+    assert counts.loc[2].sum() == 0
+    assert counts.loc[3, ["w_sets", "l_sets", "w_games"]].tolist() == [1, 1, 10]
+    assert counts.loc[4].sum() == 0
+
+    retired = parse_scores(pd.Series(["6-4 2-1 RET", "7-5 6-7(4) 5-5 RET", "6-7 RET"]))
+    assert retired[["w_sets", "l_sets"]].values.tolist() == [[1, 0], [1, 1], [0, 1]]
+    assert retired["w_games"].tolist() == [8, 18, 6]
+    assert retired["l_tiebreaks"].tolist() == [0, 1, 1]
+
+
+def test_player_season_aggregates():
+    df = pd.DataFrame(
+        {
+            "winner_id": [1, 1, 2],
+            "loser_id": [2, 3, 1],
+            "score": ["6-4 6-4", "7-6(2) 6-7(3) 6-0", "6-3 6-3"],
+            "season": [2023, 2023, 2023],
+            "surface": [2, 2, 1],
+        }
+    )
+    stats = player_season_aggregates(df).set_index(["joueur_id", "surface"])
+    clay = stats.loc[(1, 2)]
+    assert clay[["matches", "wins", "losses"]].tolist() == [2, 2, 0]
+    assert clay[["sets_won", "sets_lost"]].tolist() == [4, 1]
+    assert clay[["tiebreaks_won", "tiebreaks_lost"]].tolist() == [1, 1]
+    assert stats.loc[(1, 1), ["wins", "losses", "games_won"]].tolist() == [0, 1, 6]
+    assert len(stats) == 5
@@ -4,11 +4,12 @@ import pandas as pd
 import pytest
 
 from tennis_win_fun.build_historic.historic_launcher import BuildHistoric
+from tennis_win_fun.build_historic.models import DbNeon
 
 
 @pytest.fixture
-def bh(monkeypatch):
-    monkeypatch.setenv("DATABASE_URL", "sqlite:///tennis.db")
+def bh(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'tennis.db'}")
     return BuildHistoric()
 
 
@@ -65,3 +66,36 @@ def test_get_historic_from_csv_mocked(bh, mock_df):
                 df = bh.get_historic_from_csv("wta")
                 assert isinstance(df, pd.DataFrame)
                 assert len(df) == 4  # 2 fichiers * 2 lignes
+
+
+def test_run_match_historic_splits_shared_tourney_id(tmp_path):
+    # ATP and WTA editions of a Grand Slam share the same source tourney_id
+    bh = BuildHistoric(db=DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}"))
+    bh.dossier_csv = str(tmp_path)
+    players = {"atp": ("Carlos", "Dan"), "wta": ("Alice", "Bea")}
+    for gender, (winner, loser) in players.items():
+        row = {col: None for col in bh.all_cols}
+        row.update(
+            tourney_id="2021-580",
+            tourney_name="Australian Open",
+            surface="Hard",
+            draw_size="128",
+            tourney_level="G",
+            tourney_date="20210208",
+            winner_name=winner,
+            winner_ioc="ESP",
+            loser_name=loser,
+            loser_ioc="USA",
+            score="6-4 6-4",
+            round="F",
+        )
+        (tmp_path / gender).mkdir()
+        pd.DataFrame([row]).to_csv(tmp_path / gender / "matches.csv", index=False)
+
+    bh.run()
+    bh.run_match_historic()
+
+    names = bh.db.read_players(columns=["id", "name"]).set_index("id")["name"]
+    for gender, (winner, _) in players.items():
+        df = bh.db.read_matches(columns=["winner_id"], genders=[gender])
+        assert names[df["winner_id"]].tolist() == [winner]
@@ -0,0 +1,148 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tennis_win_fun.analysis.dataset import (
+    DATASET_COLUMNS,
+    build_features,
+    build_training_dataset,
+    head_to_head_states,
+    player_states,
+    surface_states,
+)
+from tennis_win_fun.analysis.ratings import elo_history
+from tennis_win_fun.build_historic.models import DbNeon
+
+
+@pytest.fixture
+def matches():
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "season": [2023] * 4,
+            "tourney_date": pd.to_datetime(
+                ["2023-01-02", "2023-01-02", "2023-02-01", "2023-03-01"]
+            ),
+            "gender": ["atp"] * 4,
+            "tourney_id": [1, 1, 2, 3],
+            "surface": np.array([1, 1, 2, 1], dtype="int8"),
+            "round": [6, 7, 7, 7],
+            "best_of": [3] * 4,
+            "winner_id": np.array([1, 3, 1, 3], dtype="int32"),
+            "loser_id": np.array([2, 1, 3, 1], dtype="int32"),
+            "winner_rank": pd.array([10, 5, 8, 4], dtype="Int16"),
+            "winner_rank_points": pd.array([900, 2000, 1000, 2500], dtype="Int32"),
+            "loser_rank": pd.array([20, 10, 5, 8], dtype="Int16"),
+            "loser_rank_points": pd.array([500, 900, 2000, 1000], dtype="Int32"),
+        }
+    )
+
+
+def _features(matches, seed=0):
+    return build_features(
+        matches,
+        player_states(matches),
+        surface_states(matches),
+        head_to_head_states(matches),
+        seed=seed,
+    )
+
+
+def _side_of(row, player_id):
+    return "player_1" if row["player_1_id"] == player_id else "player_2"
+
+
+def test_features_only_use_earlier_dates(matches):
+    df = _features(matches)
+    assert list(df.columns) == DATASET_COLUMNS
+    assert df["match_id"].tolist() == [1, 2, 3, 4]
+
+    rows = [(row, _side_of(row, 1)) for _, row in df.iterrows()]
+    # both matches of the first date are played without history
+    for row, side in rows[:2]:
+        assert row[f"{side}_elo"] == 1500
+        assert row[f"{side}_played"] == 0
+        assert np.isnan(row[f"{side}_form"])
+        assert row["h2h_matches"] == 0
+
+    winner_elo, loser_elo = elo_history(matches["winner_id"], matches["loser_id"])
+    row, side = rows[2]
+    assert row[f"{side}_elo"] == pytest.approx(loser_elo[1], abs=1e-3)
+    assert row[f"{side}_elo_surface"] == 1500  # first clay match
+    assert row[f"{side}_played"] == 2
+    assert row[f"{side}_form"] == pytest.approx(0.5)
+    assert row[f"{side}_days_off"] == 30
+    assert row["h2h_matches"] == 1
+
+    row, side = rows[3]
+    assert row[f"{side}_elo"] == pytest.approx(winner_elo[2], abs=1e-3)
+    assert row[f"{side}_elo_surface"] == pytest.approx(loser_elo[1], abs=1e-3)
+    assert row[f"{side}_form"] == pytest.approx(2 / 3)
+    assert row["h2h_matches"] == 2
+    h2h_wins = row["player_1_h2h_wins"]
+    if side == "player_2":
+        h2h_wins = row["h2h_matches"] - h2h_wins
+    assert h2h_wins == 1  # A beat C once before
+
+
+def test_label_follows_player_assignment(matches):
+    df = _features(matches)
+    winners = matches["winner_id"].to_numpy()
+    assert ((df["player_1_id"] == winners) == (df["player_1_won"] == 1)).all()
+    ranks = np.where(
+        df["player_1_won"] == 1, matches["winner_rank"], matches["loser_rank"]
+    )
+    assert df["player_1_rank"].tolist() == ranks.tolist()
+
+    assignments = {tuple(_features(matches, seed)["player_1_id"]) for seed in range(8)}
+    assert len(assignments) > 1
+
+
+def test_missing_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    with pytest.raises(ImportError, match="pyarrow"):
+        build_training_dataset(db, str(tmp_path / "dataset.parquet"))
+
+
+# the second chunk of 2 matches holds no gender in the second case
+@pytest.mark.parametrize("genders", [["atp", "atp"], ["atp", None]])
+def test_build_training_dataset(tmp_path, genders):
+    pytest.importorskip("pyarrow")
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_players(
+        pd.DataFrame({"name": ["A", "B", "C"], "hand": "R", "ht": 180, "ioc": "FRA"})
+    )
+    db.write_tourney(
+        pd.DataFrame(
+            {
+                "tourney_id": ["2022-1", "2023-1"],
+                "tourney_name": ["X", "Y"],
+                "surface": ["Hard", "Clay"],
+                "tourney_date": ["20220110", "20230110"],
+                "gender": genders,
+            }
+        )
+    )
+    db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [1, 1, 2],
+                "winner_id": [1, 2, 1],
+                "loser_id": [2, 3, 3],
+                "score": "6-4 6-4",
+                "surface": ["Hard", "Hard", "Clay"],
+            }
+        )
+    )
+
+    path = tmp_path / "dataset.parquet"
+    assert build_training_dataset(db, str(path), chunksize=2) == 3
+    df = pd.read_parquet(path)
+    assert list(df.columns) == DATASET_COLUMNS
+    assert df["season"].tolist() == [2022, 2022, 2023]
+    assert df["gender"].fillna("?").tolist() == ["atp", "atp", genders[1] or "?"]
+    # A and C each played one match of the previous season
+    assert df.loc[2, ["player_1_played", "player_2_played"]].tolist() == [1, 1]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from tennis_win_fun.simulation.draw_simulator import DrawSimulator, elo_win_proba
+
+
+def test_elo_win_proba():
+    win_proba = elo_win_proba({1: 1900.0, 2: 1500.0})
+    p = win_proba(np.array([1, 2, 3]), np.array([2, 1, 3]))
+    assert p[0] == pytest.approx(10 / 11)
+    assert p[0] + p[1] == pytest.approx(1.0)
+    assert p[2] == pytest.approx(0.5)
+
+
+def test_run_probabilities_sum_by_round():
+    ratings = {pid: 1500.0 + 10 * pid for pid in range(1, 33)}
+    sim = DrawSimulator(list(range(1, 33)), elo_win_proba(ratings), seed=1)
+    result = sim.run(n_sims=5_000)
+
+    assert list(result.columns) == ["R32", "R16", "QF", "SF", "F", "W"]
+    assert (result["R32"] == 1.0).all()
+    expected = [32, 16, 8, 4, 2, 1]
+    assert result.sum().round(6).tolist() == expected
+    assert result["W"].idxmax() == 32
+
+
+def test_run_with_byes_and_certain_winner():
+    # player 1 always wins, the byes give 1 and 3 a free first round
+    def win_proba(a, b):
+        return np.where(a == 1, 1.0, np.where(b == 1, 0.0, 0.5))
+
+    sim = DrawSimulator([1, None, 2, 4, 3, None, 5, 6], win_proba, seed=0)
+    result = sim.run(n_sims=1_000)
+
+    assert result.loc[1, "W"] == 1.0
+    assert list(result.columns) == ["QF", "SF", "F", "W"]
+    assert result.loc[3, "SF"] == 1.0
+    assert result.loc[[2, 4], "SF"].sum() == pytest.approx(1.0)
+    assert len(result) == 6
+
+
+def test_invalid_draw_size():
+    with pytest.raises(ValueError, match="puissance de 2"):
+        DrawSimulator([1, 2, 3], elo_win_proba({}))
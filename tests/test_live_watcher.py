@@ -0,0 +1,200 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from tennis_win_fun.build_historic.models import DbNeon
+from tennis_win_fun.build_historic.player_resolver import PlayerResolver
+from tennis_win_fun.live.watcher import (
+    EndpointSchedule,
+    LiveState,
+    LiveWatcher,
+    StubSource,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_players(
+        pd.DataFrame(
+            {
+                "name": ["Rafael Nadal", "Novak Djokovic"],
+                "hand": ["L", "R"],
+                "ht": [185, 188],
+                "ioc": ["ESP", "SRB"],
+            }
+        )
+    )
+    return db
+
+
+def read_live(db):
+    with db.engine.connect() as conn:
+        return pd.read_sql("SELECT * FROM live_scores ORDER BY event_id", conn)
+
+
+def test_live_state_only_marks_changes():
+    state = LiveState()
+    assert state.apply([{"event_id": 1, "score": "1-0"}]) == 1
+    state.pop_dirty()
+    assert state.apply([{"event_id": 1, "score": "1-0"}]) == 0
+    assert state.apply([{"event_id": 1, "score": "2-0", "foo": "bar"}]) == 1
+    assert state.pop_dirty() == [{"event_id": "1", "score": "2-0"}]
+
+
+def test_watcher_writes_only_changed_rows(db):
+    scores = [
+        [
+            {
+                "event_id": 10,
+                "home_name": "Nadal R.",
+                "away_name": "N. Djokovic",
+                "score": "0-0",
+            },
+            {"event_id": 11, "home_name": "A", "away_name": "B", "score": "0-0"},
+        ],
+        [
+            {
+                "event_id": 10,
+                "home_name": "Nadal R.",
+                "away_name": "N. Djokovic",
+                "score": "1-0",
+            },
+            {"event_id": 11, "home_name": "A", "away_name": "B", "score": "0-0"},
+        ],
+    ]
+    source = StubSource(
+        {
+            "/live": scores,
+            "/odds/10": {"data": [{"home_odds": 1.8, "away_odds": 2.1}]},
+            "/odds/11": {"data": [{"home_odds": 1.5, "away_odds": 2.6}]},
+        }
+    )
+    schedules = [
+        EndpointSchedule("scores", "/live", interval=0.01),
+        EndpointSchedule("odds", "/odds/{event_id}", interval=0.01, per_event=True),
+    ]
+    watcher = LiveWatcher(
+        db,
+        source,
+        schedules,
+        resolver=PlayerResolver.from_db(db),
+        flush_interval=0.02,
+    )
+    asyncio.run(watcher.run(duration=0.2))
+
+    live = read_live(db)
+    assert live["event_id"].tolist() == ["10", "11"]
+    assert live["score"].tolist() == ["1-0", "0-0"]
+    assert live["home_odds"].tolist() == [1.8, 1.5]
+    assert live.loc[0, ["home_id", "away_id"]].tolist() == [1, 2]
+    # many polls but only the first states, the score change and the odds
+    assert source.calls["/live"] > 5
+    assert watcher.n_writes <= 5
+
+
+def test_live_state_evicts_finished_events():
+    state = LiveState()
+    state.apply([{"event_id": 1}, {"event_id": 2}, {"event_id": 3}], source="scores")
+    state.retire("scores", {"1", "2", "3"})
+    assert state.live_events() == ["1", "2", "3"]
+
+    state.apply([{"event_id": 1}, {"event_id": 2, "status": "Finished"}], "scores")
+    state.retire("scores", {"1", "2"})
+    assert state.live_events() == ["1"]
+    # the last state of the finished events is written before they are dropped
+    state.prune()
+    assert set(state.rows) == {"1", "2", "3"}
+    state.pop_dirty()
+    state.prune()
+    assert set(state.rows) == {"1"}
+
+
+def test_watcher_stops_polling_finished_events(db):
+    source = StubSource(
+        {
+            "/live": [
+                [{"event_id": 10, "score": "0-0"}, {"event_id": 11, "score": "0-0"}],
+                [{"event_id": 10, "score": "1-0"}],
+            ],
+            "/odds/10": {"data": [{"home_odds": 1.8, "away_odds": 2.1}]},
+            "/odds/11": {"data": [{"home_odds": 1.5, "away_odds": 2.6}]},
+        }
+    )
+    schedules = [
+        EndpointSchedule("scores", "/live", interval=0.01),
+        EndpointSchedule("odds", "/odds/{event_id}", interval=0.01, per_event=True),
+    ]
+    watcher = LiveWatcher(db, source, schedules, flush_interval=0.02)
+    asyncio.run(watcher.run(duration=0.2))
+
+    assert list(watcher.state.rows) == ["10"]
+    assert source.calls.get("/odds/11", 0) <= 1
+    assert source.calls["/odds/10"] > 5
+    assert read_live(db)["event_id"].tolist() == ["10", "11"]
+
+
+def test_watcher_survives_parser_and_db_errors(db, monkeypatch):
+    def parser(payload):
+        if payload == ["garbage"]:
+            raise ValueError(payload)
+        return payload
+
+    source = StubSource({"/live": [["garbage"], [{"event_id": 10, "score": "1-0"}]]})
+    schedules = [EndpointSchedule("scores", "/live", interval=0.01, parser=parser)]
+    watcher = LiveWatcher(db, source, schedules, flush_interval=0.02)
+
+    write_live_scores = db.write_live_scores
+    failures = []
+
+    def flaky_write(df):
+        if not failures:
+            failures.append(df)
+            raise RuntimeError("connexion perdue")
+        return write_live_scores(df)
+
+    monkeypatch.setattr(db, "write_live_scores", flaky_write)
+    asyncio.run(watcher.run(duration=0.2))
+
+    assert source.calls["/live"] > 5
+    assert len(failures) == 1
+    assert read_live(db)["score"].tolist() == ["1-0"]
+
+
+def test_late_per_event_answer_is_ignored(db):
+    class SlowOdds(StubSource):
+        async def fetch(self, path):
+            if path.startswith("/odds"):
+                await asyncio.sleep(0.08)
+            return await super().fetch(path)
+
+    live = [{"event_id": 1, "status": "live", "score": "6-4 6-4"}]
+    source = SlowOdds(
+        {
+            # the match leaves the listing while its odds are requested
+            "/live": [live, live, live, []],
+            "/odds/1": {"data": [{"home_odds": 1.5, "away_odds": 2.6}]},
+        }
+    )
+    schedules = [
+        EndpointSchedule("scores", "/live", interval=0.01),
+        EndpointSchedule("odds", "/odds/{event_id}", interval=0.01, per_event=True),
+    ]
+    watcher = LiveWatcher(db, source, schedules, flush_interval=0.01)
+    asyncio.run(watcher.run(duration=0.3))
+
+    assert source.calls["/odds/1"] == 1
+    assert watcher.state.live_events() == []
+    stored = read_live(db)
+    assert stored[["status", "score"]].values.tolist() == [["live", "6-4 6-4"]]
+
+
+def test_partial_rows_keep_stored_columns(db):
+    db.write_live_scores(
+        pd.DataFrame({"event_id": ["1"], "score": ["1-0"], "home_odds": [1.5]})
+    )
+    db.write_live_scores(pd.DataFrame({"event_id": ["1"], "score": ["2-0"]}))
+    db.write_live_scores(pd.DataFrame({"event_id": ["1"], "home_odds": [1.4]}))
+    live = read_live(db)
+    assert live[["score", "home_odds"]].values.tolist() == [["2-0", 1.4]]
@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tennis_win_fun.analysis.match_store import (
+    MatchStore,
+    export_match_store,
+    from_ordinal,
+    to_ordinal,
+)
+from tennis_win_fun.build_historic.models import DbNeon
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_tourney(
+        pd.DataFrame(
+            {
+                "tourney_id": ["2023-001", "2024-001"],
+                "tourney_name": ["Open A", "Open B"],
+                "surface": ["Clay", "Hard"],
+                "tourney_date": ["20230601", "20240101"],
+                "gender": ["atp", "wta"],
+            }
+        )
+    )
+    db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [2, 1, 1],
+                "winner_id": [1, 3, 1],
+                "loser_id": [2, 4, 3],
+                "score": ["6-4 6-4", "6-1 RET", "6-4 6-4"],
+                "surface": ["Hard", "Clay", "Clay"],
+                "round": ["F", "SF", "F"],
+                "w_ace": [10, None, 3],
+            }
+        )
+    )
+    return db
+
+
+def test_ordinal_round_trip():
+    dates = pd.Series(["2023-06-01", None])
+    ordinals = to_ordinal(dates)
+    assert ordinals.dtype == np.int32
+    assert ordinals[0] == pd.Timestamp("2023-06-01").toordinal()
+    assert ordinals[1] == -1
+    back = from_ordinal(ordinals)
+    assert back[0] == np.datetime64("2023-06-01")
+    assert np.isnat(back[1])
+
+
+def test_export_and_open(db, tmp_path):
+    path = str(tmp_path / "store")
+    export_match_store(db, path, chunksize=2)
+
+    store = MatchStore(path)
+    assert len(store) == 3
+    assert store["winner_id"].dtype == np.int32
+    assert store["surface"].dtype == np.int8
+    assert isinstance(store["loser_id"], np.memmap)
+
+    # ordered by date
+    assert store.dates().tolist()[0].isoformat() == "2023-06-01"
+    assert store["surface"].tolist() == [2, 2, 1]
+    assert store.decode("score").tolist() == ["6-1 RET", "6-4 6-4", "6-4 6-4"]
+    assert store.decode("gender").tolist() == ["atp", "atp", "wta"]
+    # the score strings are memory-mapped, not parsed with the sidecar
+    with open(os.path.join(path, "store.json"), encoding="utf-8") as f:
+        assert list(json.load(f)["dictionaries"]) == ["gender"]
+
+    assert store["round"].tolist() == [6, 7, 7]
+    assert store["w_ace"].dtype == np.int16
+    assert store["w_ace"].tolist() == [-1, 3, 10]
+
+    df = store.to_frame(["tourney_id", "tourney_date"], decode=True)
+    assert df["tourney_id"].tolist() == [1, 1, 2]
+    assert df["tourney_date"].dt.year.tolist() == [2023, 2023, 2024]
+
+
+def test_unknown_column(db, tmp_path):
+    store = export_match_store(db, str(tmp_path / "store"))
+    with pytest.raises(KeyError):
+        store["elo"]
+
+
+def test_reexport_keeps_open_stores_consistent(db, tmp_path):
+    path = str(tmp_path / "store")
+    old = export_match_store(db, path)
+    db.write_matches(
+        pd.DataFrame({"tourney_id": [2], "winner_id": [5], "loser_id": [6]})
+    )
+    new = export_match_store(db, path)
+
+    assert (old.version, new.version) == (1, 2)
+    assert len(old) == len(old["winner_id"]) == 3
+    assert len(new) == len(new["winner_id"]) == 4
+    assert old["winner_id"].tolist() == [3, 1, 1]
+    assert None in new.decode("score").tolist()
+
+    export_match_store(db, path)
+    assert sorted(os.listdir(path)) == ["store.json", "v2", "v3"]
+    assert len(MatchStore(path)) == 4
@@ -0,0 +1,182 @@
+import os
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+from alembic.config import Config
+
+from alembic import command, op
+from tennis_win_fun.build_historic.models import DbNeon
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# schema of the database before the gender, row_hash and normalized matches
+# revisions (cb08834d0900)
+PRE_SERIES_SCHEMA = [
+    """CREATE TABLE tournois (
+        id INTEGER NOT NULL PRIMARY KEY,
+        tourney_id VARCHAR UNIQUE,
+        tourney_name VARCHAR NOT NULL,
+        surface VARCHAR,
+        draw_size INTEGER,
+        tourney_level VARCHAR,
+        tourney_date DATE,
+        tourney_start_date DATE
+    )""",
+    """CREATE TABLE joueurs (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        hand VARCHAR,
+        ht INTEGER,
+        ioc VARCHAR,
+        CONSTRAINT _name_ioc_uc UNIQUE (name, ioc)
+    )""",
+    """CREATE TABLE matches (
+        id INTEGER NOT NULL PRIMARY KEY,
+        tourney_id VARCHAR NOT NULL,
+        winner_id INTEGER NOT NULL,
+        loser_id INTEGER NOT NULL,
+        winner_entry VARCHAR,
+        loser_entry VARCHAR,
+        winner_name VARCHAR,
+        loser_name VARCHAR,
+        score VARCHAR,
+        CONSTRAINT _match_uc UNIQUE (tourney_id, winner_id, loser_id)
+    )""",
+]
+
+
+def _pre_series_config(tmp_path):
+    """
+    Alembic config of a database loaded before the series, stamped
+    cb08834d0900.
+    """
+    url = f"sqlite:///{tmp_path / 'tennis.db'}"
+    engine = sa.create_engine(url)
+    with engine.begin() as conn:
+        for statement in PRE_SERIES_SCHEMA:
+            conn.execute(sa.text(statement))
+        conn.execute(
+            sa.text(
+                "INSERT INTO joueurs (id, name, hand, ht, ioc) VALUES "
+                "(1, 'Carlos', 'R', 183, 'ESP'), (2, 'Dan', 'R', 190, 'USA'), "
+                "(3, 'Alice', 'R', 170, 'FRA'), (4, 'Bea', 'L', NULL, 'ESP')"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "INSERT INTO tournois (id, tourney_id, tourney_name, surface, "
+                "draw_size, tourney_level, tourney_date) VALUES "
+                "(1, '2023-0580', 'Australian Open', 'Hard', 128, 'G', '2023-01-16'), "
+                "(2, '2023-0301', 'Auckland', 'Hard', 28, 'A', '2023-01-09'), "
+                "(3, '2023-1003', 'Hobart', 'Hard', 32, 'P', '2023-01-09')"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "INSERT INTO matches (id, tourney_id, winner_id, loser_id, "
+                "winner_name, loser_name, score) VALUES "
+                "(1, '2023-0580', 1, 2, 'Carlos', 'Dan', '6-4 6-4 6-4'), "
+                "(2, '2023-0580', 3, 4, 'Alice', 'Bea', '6-4 6-4'), "
+                "(3, '2023-0301', 2, 1, 'Dan', 'Carlos', '6-4 6-4'), "
+                "(4, '2023-1003', 4, 3, 'Bea', 'Alice', '6-4 6-4')"
+            )
+        )
+    engine.dispose()
+
+    cfg = Config()
+    cfg.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    command.stamp(cfg, "cb08834d0900")
+    return cfg
+
+
+@pytest.fixture
+def pre_series_db(tmp_path):
+    cfg = _pre_series_config(tmp_path)
+    command.upgrade(cfg, "head")
+    return DbNeon(db_url=cfg.get_main_option("sqlalchemy.url"))
+
+
+def test_upgrade_backfills_genders(pre_series_db):
+    db = pre_series_db
+    players = db.read_players(columns=["id", "gender"]).set_index("id")
+    assert players["gender"].astype(str).to_dict() == {
+        1: "atp",
+        2: "atp",
+        3: "wta",
+        4: "wta",
+    }
+    tourneys = db.read_tourneys(columns=["tourney_id", "gender"])
+    assert sorted(map(tuple, tourneys.astype(str).values.tolist())) == [
+        ("2023-0301", "atp"),
+        ("2023-0580", "atp"),
+        ("2023-0580", "wta"),
+        ("2023-1003", "wta"),
+    ]
+    matches = db.read_matches(columns=["id", "gender"]).set_index("id")
+    assert matches["gender"].astype(str).to_dict() == {
+        1: "atp",
+        2: "wta",
+        3: "atp",
+        4: "wta",
+    }
+
+
+def test_reload_after_upgrade_adds_no_rows(pre_series_db):
+    db = pre_series_db
+    db.write_tourney(
+        pd.DataFrame(
+            {
+                "tourney_id": ["2023-0580", "2023-0580", "2023-0301"],
+                "tourney_name": ["Australian Open", "Australian Open", "Auckland"],
+                "surface": "Hard",
+                "tourney_level": ["G", "G", "A"],
+                "tourney_date": ["20230116", "20230116", "20230109"],
+                "gender": ["atp", "wta", "atp"],
+            }
+        )
+    )
+    assert len(db.read_tourneys(columns=["id"])) == 4
+
+    tourneys = db.read_tourneys(columns=["id", "tourney_id", "gender"])
+    ids = {(t, str(g)): i for i, t, g in tourneys.values.tolist()}
+    db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [ids[("2023-0580", "atp")], ids[("2023-0301", "atp")]],
+                "winner_id": [1, 2],
+                "loser_id": [2, 1],
+                "score": ["6-4 6-4 6-4", "6-4 6-4"],
+                "surface": "Hard",
+            }
+        )
+    )
+    assert len(db.read_matches(columns=["id"])) == 4
+
+
+@pytest.mark.parametrize(
+    "previous, revision, failing_op",
+    [
+        ("e2a84c9f1b37", "f4c6e1d09a23", "batch_alter_table"),
+        ("f4c6e1d09a23", "a9d3e57c0b81", "create_table"),
+    ],
+)
+def test_failed_backfilled_revision_can_run_again(
+    tmp_path, monkeypatch, previous, revision, failing_op
+):
+    cfg = _pre_series_config(tmp_path)
+    command.upgrade(cfg, previous)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("panne")
+
+    # the backfill is committed, the rest of the revision is rolled back
+    with monkeypatch.context() as patch:
+        patch.setattr(op, failing_op, fail)
+        with pytest.raises(RuntimeError, match="panne"):
+            command.upgrade(cfg, revision)
+
+    command.upgrade(cfg, "head")
+    db = DbNeon(db_url=cfg.get_main_option("sqlalchemy.url"))
+    assert len(db.read_matches(columns=["id"])) == 4
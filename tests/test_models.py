@@ -0,0 +1,209 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from tennis_win_fun.build_historic.models import DbNeon, compute_row_hash
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_players(
+        pd.DataFrame(
+            {
+                "name": ["Alice", "Bea", "Carlos", "Dan"],
+                "hand": ["R", "L", "R", "R"],
+                "ht": [170, None, 183, 190],
+                "ioc": ["FRA", "ESP", "ESP", "USA"],
+                "gender": ["wta", "wta", "atp", "atp"],
+            }
+        )
+    )
+    db.write_tourney(
+        pd.DataFrame(
+            {
+                "tourney_id": ["2023-001", "2023-002", "2024-001"],
+                "tourney_name": ["Open A", "Open B", "Open A"],
+                "surface": ["Hard", "Clay", "Hard"],
+                "draw_size": ["32", "64", "32"],
+                "tourney_level": ["G", "G", "A"],
+                "tourney_date": ["20230101", "20230601", "20240101"],
+                "tourney_start_date": ["2023-01-01", "2023-06-01", "2024-01-01"],
+                "gender": ["wta", "atp", "atp"],
+            }
+        )
+    )
+    return db
+
+
+def test_read_players_projection_and_dtypes(db):
+    df = db.read_players(columns=["id", "name", "ht"])
+    assert list(df.columns) == ["id", "name", "ht"]
+    assert df["id"].dtype == "int32"
+    assert df["ht"].dtype == "Int16"
+    assert df["ht"].isna().sum() == 1
+
+
+def test_read_players_filters(db):
+    df = db.read_players(columns=["name"], genders=["atp"])
+    assert sorted(df["name"]) == ["Carlos", "Dan"]
+    df = db.read_players(names=["Alice", "Unknown"])
+    assert df["name"].tolist() == ["Alice"]
+    assert df["gender"].tolist() == ["wta"]
+
+
+def test_read_tourneys_date_range(db):
+    df = db.read_tourneys(
+        columns=["tourney_id"],
+        start_date=date(2023, 3, 1),
+        end_date=date(2023, 12, 31),
+    )
+    assert df["tourney_id"].tolist() == ["2023-002"]
+
+
+def test_read_tourneys_chunked(db):
+    chunks = list(db.read_tourneys(columns=["id", "tourney_name"], chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert all(c["id"].dtype == "int32" for c in chunks)
+
+
+def test_read_unknown_column(db):
+    with pytest.raises(ValueError, match="Colonnes inconnues"):
+        db.read_players(columns=["age"])
+
+
+def test_compute_row_hash():
+    df = pd.DataFrame({"a": ["x", "x", "y"], "b": [1, 1, None]})
+    hashes = compute_row_hash(df, ["a", "b"])
+    assert hashes.dtype == "int64"
+    assert hashes[0] == hashes[1]
+    assert hashes[0] != hashes[2]
+
+
+def test_write_players_updates_changed_rows(db):
+    before = db.read_players(columns=["id", "name", "ht", "row_hash"])
+    db.write_players(
+        pd.DataFrame(
+            {
+                "name": ["Alice", "Bea"],
+                "hand": ["R", "L"],
+                "ht": [170, 171],
+                "ioc": ["FRA", "ESP"],
+                "gender": ["wta", "wta"],
+            }
+        )
+    )
+    after = db.read_players(columns=["id", "name", "ht", "row_hash"])
+    assert len(after) == len(before)
+    changed = after.compare(before)
+    assert after.loc[changed.index, "name"].tolist() == ["Bea"]
+    assert after.set_index("name").loc["Bea", "ht"] == 171
+
+
+def test_write_matches_updates_corrected_score(db):
+    df = pd.DataFrame(
+        {
+            "tourney_id": [1.0, 1.0],
+            "winner_id": [1.0, 3.0],
+            "loser_id": [2.0, 4.0],
+            "winner_name": ["Alice", "Carlos"],
+            "loser_name": ["Bea", "Dan"],
+            "score": ["6-4 6-4", "6-1 RET"],
+        }
+    )
+    db.write_matches(df.copy())
+    df.loc[1, "score"] = "6-1 6-0"
+    db.write_matches(df.copy())
+
+    stored = db.read_matches(columns=["tourney_id", "score", "tourney_date"])
+    assert sorted(stored["score"]) == ["6-1 6-0", "6-4 6-4"]
+    assert stored["tourney_id"].tolist() == [1, 1]
+    assert stored["tourney_date"].dt.year.tolist() == [2023, 2023]
+
+
+def test_refresh_player_season_stats_incremental(db):
+    first = db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [1, 3],
+                "winner_id": [1, 3],
+                "loser_id": [2, 4],
+                "score": ["6-4 6-4", "6-1 6-1"],
+                "surface": ["Hard", "Hard"],
+                "w_ace": [5, None],
+            }
+        )
+    )
+    assert len(first) == 2
+    db.refresh_player_season_stats()
+    stats = db.read_player_season_stats(seasons=[2023])
+    assert sorted(stats["joueur_id"]) == [1, 2]
+
+    changed = db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [1, 2],
+                "winner_id": [1, 1],
+                "loser_id": [2, 3],
+                "score": ["6-4 6-4", "7-6(1) 6-3"],
+                "surface": ["Hard", "Clay"],
+                "w_ace": [5, 7],
+            }
+        )
+    )
+    assert changed[["tourney_id", "loser_id"]].values.tolist() == [[2, 3]]
+    db.refresh_player_season_stats(changed)
+
+    stats = db.read_player_season_stats(player_ids=[1], seasons=[2023])
+    by_surface = stats.set_index("surface")
+    assert by_surface.loc[1, ["wins", "games_won"]].tolist() == [1, 12]
+    assert by_surface.loc[2, ["wins", "tiebreaks_won"]].tolist() == [1, 1]
+    assert by_surface["aces"].tolist() == [5, 7]
+    clay = db.read_player_season_stats(player_ids=[3], surfaces=["Clay"])
+    assert clay[["losses", "games_lost"]].values.tolist() == [[1, 13]]
+    # untouched players keep their rows
+    assert len(db.read_player_season_stats(seasons=[2024])) == 2
+
+
+def test_write_matches_routes_rows_by_season(db):
+    db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [3, 1, 2],
+                "winner_id": [3, 1, 3],
+                "loser_id": [4, 2, 4],
+                "score": ["6-1 6-1", "6-4 6-4", "6-3 6-3"],
+            }
+        )
+    )
+    assert [t.name for t in db.match_tables()] == ["matches_2023", "matches_2024"]
+    assert [t.name for t in db.match_tables(2024)] == ["matches_2024"]
+
+    stored = db.read_matches(columns=["id", "season", "tourney_id"])
+    assert stored["season"].tolist() == [2023, 2023, 2024]
+    assert stored["tourney_id"].tolist() == [1, 2, 3]
+    assert stored["id"].is_unique
+
+    recent = db.read_matches(columns=["tourney_id"], start_date=date(2024, 1, 1))
+    assert recent["tourney_id"].tolist() == [3]
+    chunks = list(db.read_matches(columns=["tourney_id"], chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert db.read_matches(columns=["id"], start_date=date(2030, 1, 1)).empty
+
+
+def test_grand_slam_has_one_tourney_per_gender(db):
+    slam = {
+        "tourney_id": ["2021-580", "2021-580"],
+        "tourney_name": ["Australian Open", "Australian Open"],
+        "surface": ["Hard", "Hard"],
+        "tourney_date": ["20210208", "20210208"],
+        "gender": ["wta", "atp"],
+    }
+    db.write_tourney(pd.DataFrame(slam))
+    db.write_tourney(pd.DataFrame(slam))  # unchanged on re-run
+
+    df = db.read_tourneys(columns=["id", "gender"], tourney_ids=["2021-580"])
+    assert sorted(df["gender"]) == ["atp", "wta"]
+    atp = db.read_tourneys(columns=["tourney_id"], genders=["atp"])
+    assert "2021-580" in atp["tourney_id"].tolist()
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+from tennis_win_fun.build_historic.models import DbNeon
+from tennis_win_fun.build_historic.player_resolver import (
+    PlayerResolver,
+    normalize_name,
+)
+
+
+@pytest.fixture
+def players():
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "name": [
+                "Rafael Nadal",
+                "Jo-Wilfried Tsonga",
+                "Juan Martin del Potro",
+                "Iga Swiatek",
+            ],
+            "ioc": ["ESP", "FRA", "ARG", "POL"],
+        }
+    )
+
+
+def test_normalize_name():
+    assert normalize_name("Iga Świątek") == "iga swiatek"
+    assert normalize_name("Jo-Wilfried  Tsonga") == "jo wilfried tsonga"
+    assert normalize_name(None) == ""
+
+
+@pytest.mark.parametrize(
+    "name, ioc, expected",
+    [
+        ("Rafael Nadal", "ESP", 1),
+        ("Nadal R.", None, 1),
+        ("Jo Wilfried Tsonga", "FRA", 2),
+        ("J. M. Del Potro", "ARG", 3),
+        ("Iga Świątek", None, 4),
+        ("Roger Federer", "SUI", None),
+    ],
+)
+def test_resolve(players, name, ioc, expected):
+    resolver = PlayerResolver(players)
+    joueur_id, score = resolver.resolve(name, ioc)
+    assert joueur_id == expected
+    if expected is not None:
+        assert score >= resolver.threshold
+
+
+def test_resolve_player_who_changed_ioc():
+    players = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "name": ["Daria Kasatkina", "Daria Saville"],
+            "ioc": ["RUS", "AUS"],
+        }
+    )
+    resolver = PlayerResolver(players)
+    assert resolver.resolve("Daria Kasatkina", "AUS") == (1, 1.0)
+    assert resolver.resolve("Kasatkina D.", "AUS")[0] == 1
+
+
+def test_ambiguous_name_is_not_resolved():
+    players = pd.DataFrame(
+        {"id": [1, 2], "name": ["John Smith", "Jack Smith"], "ioc": ["USA", "GBR"]}
+    )
+    resolver = PlayerResolver(players)
+    joueur_id, score = resolver.resolve("Smith J.")
+    assert joueur_id is None and score >= resolver.threshold
+    assert resolver.new_aliases().empty
+    # the ioc breaks the tie
+    assert resolver.resolve("Smith J.", "GBR")[0] == 2
+
+
+def test_resolve_many_and_aliases(players, tmp_path):
+    resolver = PlayerResolver(players)
+    df = resolver.resolve_many(["Nadal R.", "Rafael Nadal", "Nobody"], ["ESP"] * 3)
+    assert df["joueur_id"].tolist() == [1, 1, pd.NA]
+
+    # only the fuzzy match is a new alias
+    aliases = resolver.new_aliases(source="rapidapi")
+    assert aliases["alias"].tolist() == ["nadal r"]
+
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_players(players.assign(hand=None, ht=None))
+    resolver.save_aliases(db, source="rapidapi")
+    saved = db.read_player_aliases()
+    assert saved[["alias", "joueur_id"]].values.tolist() == [["nadal r", 1]]
+
+    reloaded = PlayerResolver.from_db(db)
+    assert reloaded._cache[("nadal r", "ESP")] == (1, pytest.approx(0.95))
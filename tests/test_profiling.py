@@ -0,0 +1,54 @@
+import argparse
+import os
+
+from tennis_win_fun.build_historic.profiling import (
+    NoProfiler,
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def work():
+    return sorted(fib(i) for i in range(18))
+
+
+def test_stage_profiler_outputs(tmp_path):
+    profiler = StageProfiler(str(tmp_path), trace_memory=True, top_n=5)
+    with profiler.stage("compute"):
+        work()
+    with profiler.stage("alloc"):
+        _ = [0] * 100_000
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == [
+        "01_compute.collapsed",
+        "01_compute.pstats",
+        "02_alloc.collapsed",
+        "02_alloc.pstats",
+    ]
+    lines = (tmp_path / "01_compute.collapsed").read_text().splitlines()
+    fib_lines = [line for line in lines if "fib (test_profiling.py" in line]
+    assert fib_lines
+    stack, micros = fib_lines[0].rsplit(" ", 1)
+    assert "work (test_profiling.py" in stack
+    assert int(micros) >= 0
+
+    summary = profiler.report()
+    assert "compute" in summary and "pic mémoire" in summary
+    assert (tmp_path / "summary.txt").exists()
+
+
+def test_profiler_from_args(tmp_path):
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    assert isinstance(profiler_from_args(parser.parse_args([])), NoProfiler)
+
+    args = parser.parse_args(["--profile", str(tmp_path), "--top", "3"])
+    profiler = profiler_from_args(args)
+    assert isinstance(profiler, StageProfiler)
+    assert profiler.top_n == 3 and not profiler.trace_memory
@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tennis_win_fun.analysis.match_store import export_match_store
+from tennis_win_fun.analysis.ratings import elo_predictions
+from tennis_win_fun.analysis.sweep import evaluate, param_grid, run_sweep
+from tennis_win_fun.build_historic.models import DbNeon
+
+
+@pytest.fixture
+def store(tmp_path):
+    db = DbNeon(db_url=f"sqlite:///{tmp_path / 'tennis.db'}")
+    db.write_tourney(
+        pd.DataFrame(
+            {
+                "tourney_id": [f"2023-{i:03d}" for i in range(10)],
+                "tourney_name": ["Open"] * 10,
+                "surface": ["Hard", "Clay"] * 5,
+                "tourney_date": [f"2023{i + 1:02d}01" for i in range(10)],
+            }
+        )
+    )
+    # player 1 always beats 2 and 3, 2 always beats 3
+    db.write_matches(
+        pd.DataFrame(
+            {
+                "tourney_id": [i + 1 for i in range(10) for _ in range(3)],
+                "surface": ["Hard", "Hard", "Clay"] * 10,
+                "winner_id": [1, 1, 2] * 10,
+                "loser_id": [2, 3, 3] * 10,
+            }
+        )
+    )
+    return export_match_store(db, str(tmp_path / "store"))
+
+
+def test_param_grid():
+    grid = param_grid(k=[16, 32], surface_weight=[0.0, 0.5])
+    assert len(grid) == 4
+    assert grid[-1] == {"k": 32, "surface_weight": 0.5}
+
+
+def test_elo_predictions(store):
+    proba = elo_predictions(store, k=32)
+    assert proba[0] == pytest.approx(0.5)
+    assert proba[-1] > 0.7
+
+
+def test_evaluate(store):
+    metrics = evaluate(np.full(len(store), 0.5), store, eval_from=date(2023, 6, 1))
+    assert metrics["n_matches"] == 15
+    assert metrics["log_loss"] == pytest.approx(np.log(2))
+    assert metrics["brier"] == pytest.approx(0.25)
+    assert "roi" not in metrics
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_sweep(store, processes):
+    configs = param_grid(k=[8, 64], surface_weight=[0.0, 0.5])
+    results = run_sweep(store.path, elo_predictions, configs, processes=processes)
+    assert len(results) == 4
+    assert {"k", "surface_weight", "log_loss", "brier", "accuracy"} <= set(results)
+    # ratings separate faster with a bigger K on this deterministic history
+    assert results.loc[0, "k"] == 64
+    assert results["log_loss"].is_monotonic_increasing